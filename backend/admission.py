@@ -0,0 +1,162 @@
+### backend/admission.py
+
+import asyncio
+import ipaddress
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+from jose import jwt, JWTError
+
+from auth import SECRET_KEY, ALGORITHM
+from logging_config import get_logger
+from metrics import Counter, Gauge
+
+logger = get_logger("admission")
+
+MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+MAX_TRACKED_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# X-Real-IP는 누구나 보낼 수 있으므로, 켜더라도 TRUSTED_PROXIES에서 온 요청의 값만 믿습니다.
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "False").lower() == "true"
+# 앞단 프록시(nginx) 주소나 대역, 쉼표로 구분. docker 네트워크라면 예: 172.16.0.0/12
+TRUSTED_PROXIES = tuple(
+    ipaddress.ip_network(entry.strip(), strict=False)
+    for entry in os.getenv("TRUSTED_PROXIES", "127.0.0.1,::1").split(",")
+    if entry.strip()
+)
+
+in_flight_gauge = Gauge("safesurf_admission_in_flight", "Analysis requests currently executing")
+queue_depth_gauge = Gauge("safesurf_admission_queue_depth", "Analysis requests waiting for a slot")
+admitted_counter = Counter("safesurf_admission_admitted_total", "Analysis requests admitted")
+shed_counter = Counter("safesurf_admission_shed_total", "Analysis requests rejected by admission control")
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets; the least recently seen clients are evicted first."""
+
+    def __init__(self, rate_per_minute, burst, max_clients):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Take one token for ``key``. Returns 0 on success, otherwise seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                retry_after = 0
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / self.rate if self.rate > 0 else 60
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class AdmissionController:
+    """Global in-flight cap with a bounded, time-limited wait queue."""
+
+    def __init__(self, max_in_flight, max_queue, queue_timeout):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = None
+
+    def _get_semaphore(self):
+        # 이벤트 루프가 뜬 뒤에 생성해야 하므로 첫 요청에서 만듭니다.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    async def acquire(self):
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self.waiting >= self.max_queue:
+                shed_counter.inc(reason="queue_full")
+                raise HTTPException(status_code=503, detail="Server is busy, try again later", headers={"Retry-After": "1"})
+            self.waiting += 1
+            queue_depth_gauge.set(self.waiting)
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                shed_counter.inc(reason="queue_timeout")
+                raise HTTPException(status_code=503, detail="Server is busy, try again later", headers={"Retry-After": "1"})
+            finally:
+                self.waiting -= 1
+                queue_depth_gauge.set(self.waiting)
+        else:
+            await semaphore.acquire()
+        self.in_flight += 1
+        in_flight_gauge.set(self.in_flight)
+        admitted_counter.inc()
+
+    def release(self):
+        self.in_flight -= 1
+        in_flight_gauge.set(self.in_flight)
+        self._get_semaphore().release()
+
+
+limiter = TokenBucketLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, MAX_TRACKED_CLIENTS)
+controller = AdmissionController(MAX_IN_FLIGHT, MAX_QUEUE, QUEUE_TIMEOUT)
+
+
+def client_key(request: Request):
+    """Identify the caller by verified user id, falling back to the client IP."""
+    token = request.cookies.get("access_token")
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header[len("Bearer "):]
+    if token:
+        try:
+            user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+            if user_id:
+                return f"user:{user_id}"
+        except JWTError:
+            pass
+    peer = request.client.host if request.client else None
+    # nginx가 X-Real-IP를 $remote_addr로 덮어쓰므로, 요청이 그 프록시를 거쳐 왔을 때만 이 값을 사용합니다.
+    real_ip = request.headers.get("X-Real-IP") if TRUST_PROXY_HEADERS and is_trusted_proxy(peer) else None
+    if real_ip:
+        return f"ip:{real_ip}"
+    return f"ip:{peer or 'unknown'}"
+
+
+def is_trusted_proxy(host):
+    try:
+        address = ipaddress.ip_address(host)
+    except (TypeError, ValueError):
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+async def admission_control(request: Request):
+    """FastAPI dependency guarding the expensive analysis endpoints."""
+    key = client_key(request)
+    retry_after = limiter.acquire(key)
+    if retry_after:
+        shed_counter.inc(reason="rate_limited")
+        logger.info("rate limited", extra={"client": key, "path": request.url.path, "sample": True})
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
+
+    await controller.acquire()
+    try:
+        yield
+    finally:
+        controller.release()
@@ -0,0 +1,166 @@
+### backend/ai_model/allowlist.py
+
+import os
+import csv
+import logging
+import threading
+import time
+
+from ai_model.urls import registrable_domain
+
+logger = logging.getLogger("safesurf.allowlist")
+
+ALLOWLIST_ENABLED = os.getenv("ALLOWLIST_ENABLED", "True").lower() == "true"
+ALLOWLIST_PATH = os.getenv(
+    "ALLOWLIST_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "top_sites.csv"),
+)
+ALLOWLIST_MAX_RANK = int(os.getenv("ALLOWLIST_MAX_RANK", "10000"))
+# 한 줄에 하나씩 "+domain"(강제 허용) 또는 "-domain"(강제 제외)을 적는 관리자용 파일입니다.
+ALLOWLIST_OVERRIDES_PATH = os.getenv("ALLOWLIST_OVERRIDES_PATH", "")
+ALLOWLIST_RELOAD_INTERVAL = float(os.getenv("ALLOWLIST_RELOAD_INTERVAL", "30"))
+
+# 누구나 콘텐츠를 올리거나 임의의 주소로 보내 주는 호스트는 상위 도메인에 속하더라도 허용 목록으로 판정하지 않습니다.
+_SHARED_HOSTS = frozenset("""
+sites.google.com docs.google.com drive.google.com forms.google.com script.google.com groups.google.com
+translate.google.com storage.googleapis.com firebasestorage.googleapis.com
+onedrive.live.com 1drv.ms storage.live.com forms.office.com sway.office.com forms.microsoft.com
+gist.github.com raw.githubusercontent.com
+spark.adobe.com express.adobe.com acrobat.adobe.com documentcloud.adobe.com indd.adobe.com
+l.facebook.com lm.facebook.com l.instagram.com out.reddit.com
+blog.naver.com cafe.naver.com m.blog.naver.com m.cafe.naver.com blog.daum.net cafe.daum.net
+disk.yandex.ru forms.yandex.ru docs.yandex.ru sites.yandex.ru zen.yandex.ru
+docs.qq.com wj.qq.com txc.qq.com
+pan.baidu.com yun.baidu.com wenku.baidu.com tieba.baidu.com zhidao.baidu.com baijiahao.baidu.com
+""".split())
+
+# 사용자 콘텐츠가 임의의 하위 도메인·경로(저장소, 회의 페이지, 고객 조직 사이트 등)에 걸쳐 있는 도메인입니다.
+# 상위 사이트 목록(ALLOWLIST_PATH를 바꿔도)에 있더라도 허용 목록으로 판정하지 않고 전체 분석을 거칩니다.
+_SHARED_DOMAINS = frozenset("""
+github.com gitlab.com bitbucket.org zoom.us salesforce.com slack.com
+""".split())
+
+# 등록 가능한 도메인별로, 다른 사이트로 보내 주는 경로(open redirect) 접두사입니다.
+_SHARED_PATHS = {
+    "google.com": ("/url", "/amp/", "/imgres", "/travel/clk"),
+    "youtube.com": ("/redirect", "/attribution_link"),
+    "bing.com": ("/ck/a", "/aclick"),
+    "facebook.com": ("/l.php", "/flx/warn"),
+    "linkedin.com": ("/redir/", "/slink"),
+    "yahoo.com": ("/rd/",),
+    "baidu.com": ("/link",),
+    "yandex.ru": ("/clck/", "/redir"),
+}
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+class DomainAllowlist:
+    """
+    @class DomainAllowlist
+    @brief 상위 사이트 목록(rank,domain)을 등록 가능한 도메인 단위의 set으로 들고 있는 클래스
+    max_rank 이내의 도메인만 메모리에 올리며, 목록 파일과 관리자 override 파일이
+    바뀌면 다시 읽습니다.
+    """
+    def __init__(self, path=ALLOWLIST_PATH, overrides_path=ALLOWLIST_OVERRIDES_PATH,
+                 max_rank=ALLOWLIST_MAX_RANK, reload_interval=ALLOWLIST_RELOAD_INTERVAL):
+        self.path = path
+        self.overrides_path = overrides_path
+        self.max_rank = max_rank
+        self.reload_interval = reload_interval
+        self.domains = frozenset()
+        self.forced_allow = frozenset()
+        self.forced_deny = frozenset()
+        self._mtimes = (None, None)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _load_ranked(self):
+        domains = set()
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or row[0].startswith("#"):
+                    continue
+                try:
+                    rank = int(row[0])
+                except ValueError:
+                    continue
+                if rank <= self.max_rank:
+                    domains.add(registrable_domain(row[1]))
+        return frozenset(domains)
+
+    def _load_overrides(self):
+        allow, deny = set(), set()
+        if not self.overrides_path:
+            return frozenset(), frozenset()
+        with open(self.overrides_path, encoding="utf-8") as f:
+            for line in f:
+                entry = line.strip().lower()
+                if not entry or entry.startswith("#"):
+                    continue
+                if entry.startswith("-"):
+                    deny.add(entry[1:].strip())
+                else:
+                    allow.add(entry.lstrip("+").strip())
+        return frozenset(allow), frozenset(deny)
+
+    def reload(self):
+        try:
+            domains = self._load_ranked()
+            allow, deny = self._load_overrides()
+        except OSError as e:
+            logger.warning("could not load allowlist", extra={"path": self.path, "error": str(e)})
+            return
+        self.domains, self.forced_allow, self.forced_deny = domains, allow, deny
+        self._mtimes = (_mtime(self.path), _mtime(self.overrides_path))
+        logger.info("allowlist loaded", extra={"count": len(domains), "overrides": len(allow) + len(deny)})
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            if (_mtime(self.path), _mtime(self.overrides_path)) != self._mtimes:
+                self.reload()
+
+    def match(self, hostname, path=None):
+        """
+        @brief hostname(과 path)이 허용 목록에 해당하는지 검사합니다.
+        override 파일의 강제 제외(-)가 가장 우선이며, 그 다음 강제 허용(+), 상위 사이트 목록 순입니다.
+        사용자 콘텐츠 도메인·호스트(_SHARED_DOMAINS, _SHARED_HOSTS)와 open redirect 경로(_SHARED_PATHS)는
+        목록에 있어도 제외합니다.
+        @return 매칭된 도메인, 해당하지 않으면 None
+        """
+        self._maybe_reload()
+        if not hostname:
+            return None
+        host = hostname.lower().rstrip(".")
+        domain = registrable_domain(host)
+        if host in self.forced_deny or domain in self.forced_deny:
+            return None
+        if host in self.forced_allow:
+            return host
+        if domain in self.forced_allow:
+            return domain
+        if domain in _SHARED_DOMAINS or host in _SHARED_HOSTS:
+            return None
+        if path and path.lower().startswith(_SHARED_PATHS.get(domain, ())):
+            return None
+        return domain if domain in self.domains else None
+
+
+allowlist = DomainAllowlist() if ALLOWLIST_ENABLED else None
+
+
+def match(hostname, path=None):
+    """허용 목록이 꺼져 있으면 항상 None을 반환합니다."""
+    return allowlist.match(hostname, path) if allowlist is not None else None
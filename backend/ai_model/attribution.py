@@ -0,0 +1,69 @@
+### backend/ai_model/attribution.py
+
+import numpy as np
+
+
+class TreeExplainer:
+    """
+    @class TreeExplainer
+    @brief 트리 앙상블의 예측 확률을 특징별 기여도로 분해하는 클래스
+    루트에서 리프까지 내려가며 분기할 때마다 바뀐 클래스 확률을 그 노드의 분기 특징에 더합니다(decision-path 기여도).
+    노드마다 루트부터의 누적 기여도를 미리 계산해 두므로, 예측 시에는 트리별 리프 번호를 구해 표에서 꺼내 더하기만 합니다.
+    bias + 기여도 합 = predict_proba 가 성립합니다.
+    """
+    def __init__(self, forest):
+        self.classes = np.asarray(forest.classes_)
+        n_features = forest.n_features_in_
+        n_classes = len(self.classes)
+        self.trees = [estimator.tree_ for estimator in forest.estimators_]
+
+        tables = []
+        self.offsets = np.zeros(len(self.trees), dtype=np.intp)
+        bias = np.zeros(n_classes)
+        offset = 0
+        for index, tree in enumerate(self.trees):
+            value = tree.value[:, 0, :]
+            value = value / value.sum(axis=1, keepdims=True)
+            table = np.zeros((tree.node_count, n_features, n_classes), dtype=np.float32)
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                for child in (tree.children_left[node], tree.children_right[node]):
+                    if child == -1:
+                        continue
+                    table[child] = table[node]
+                    table[child, tree.feature[node]] += value[child] - value[node]
+                    stack.append(child)
+            tables.append(table)
+            bias += value[0]
+            self.offsets[index] = offset
+            offset += tree.node_count
+
+        n_trees = len(self.trees)
+        self.table = np.concatenate(tables) / n_trees
+        self.bias = bias / n_trees
+
+    @staticmethod
+    def supports(model):
+        return hasattr(model, "estimators_") and all(hasattr(e, "tree_") for e in getattr(model, "estimators_", []))
+
+    def contributions(self, X):
+        """
+        @brief 여러 행의 특징별·클래스별 기여도를 한 번에 계산합니다.
+        @param X (n_samples, n_features) 배열
+        @return (n_samples, n_features, n_classes) 기여도 배열
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        leaves = np.column_stack([tree.apply(X) for tree in self.trees]) + self.offsets
+        return self.table[leaves].sum(axis=1)
+
+    def explain(self, X):
+        """
+        @brief 각 행에 대해 예측 클래스와, 그 클래스 확률에 대한 특징별 기여도를 반환합니다.
+        @return (class_values, probabilities, contributions) — contributions는 (n_samples, n_features)
+        """
+        contributions = self.contributions(X)
+        proba = self.bias + contributions.sum(axis=1)
+        best = proba.argmax(axis=1)
+        rows = np.arange(len(best))
+        return self.classes[best], proba[rows, best], contributions[rows, :, best]
@@ -0,0 +1,138 @@
+### backend/ai_model/breaker.py
+
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("safesurf.breaker")
+
+# 연속 실패가 이 횟수에 이르면 차단(open)합니다.
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+# 차단 후 이 시간(초)이 지나면 요청 하나만 시험 삼아 보내 봅니다(half-open).
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+# 대상 호스트별 breaker를 최대 몇 개까지 기억할지. 넘으면 닫힌 것부터 오래된 순으로 버립니다.
+BREAKER_MAX_HOSTS = int(os.getenv("BREAKER_MAX_HOSTS", "10000"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Throttled(Exception):
+    """
+    @brief 우리 쪽 속도 제한(대기열이 가득 차거나 차례를 기다리다 시간 초과) 때문에 upstream을 호출하지 못했을 때 발생합니다.
+    upstream 장애가 아니므로 breaker는 실패로 세지 않습니다.
+    """
+
+
+class CircuitBreaker:
+    """
+    @class CircuitBreaker
+    @brief upstream 하나의 상태(closed → open → half_open → closed)를 관리하는 클래스
+    open인 동안 allow()는 바로 False를 돌려주므로 호출자는 기다리지 않고 대체 값을 씁니다.
+    half_open에서는 시험 요청 하나만 통과시키고, 그 결과로 닫거나 다시 엽니다.
+    """
+    __slots__ = ("name", "failure_threshold", "reset_timeout", "state", "failures", "opened_at",
+                 "_trial", "_lock", "_listener")
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT,
+                 listener=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = 0.0
+        self._lock = threading.Lock()
+        self._listener = listener
+
+    def _transition(self, state):
+        previous, self.state = self.state, state
+        if previous != state:
+            logger.info("circuit state changed", extra={"upstream": self.name, "from": previous, "to": state})
+            if self._listener is not None:
+                self._listener(self.name, previous, state)
+
+    def allow(self):
+        """
+        @brief 지금 upstream을 호출해도 되는지 반환합니다. half_open 시험 요청이면 True를 한 번만 돌려줍니다.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(HALF_OPEN)
+            # 시험 요청의 결과가 끝내 기록되지 않아도 reset_timeout 뒤에는 다시 시험합니다.
+            now = time.monotonic()
+            if self._trial and now - self._trial < self.reset_timeout:
+                return False
+            self._trial = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial = 0.0
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = 0.0
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+
+class BreakerRegistry:
+    """
+    @class BreakerRegistry
+    @brief 이름별 CircuitBreaker를 필요할 때 만들어 돌려주는 저장소
+    이름은 "whois", "geo", "host:<hostname>" 형식이며, ':' 앞부분이 upstream 종류입니다.
+    listener(name, from_state, to_state)를 지정하면 상태가 바뀔 때마다 호출됩니다(메트릭 연결용).
+    """
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT,
+                 max_hosts=BREAKER_MAX_HOSTS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_hosts = max_hosts
+        self.listener = None
+        self._breakers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _notify(self, name, previous, state):
+        if self.listener is not None:
+            self.listener(name, previous, state)
+
+    def get(self, name):
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout, listener=self._notify)
+                self._breakers[name] = breaker
+                if len(self._breakers) > self.max_hosts:
+                    self._evict()
+            return breaker
+
+    def for_host(self, hostname):
+        return self.get(f"host:{hostname}")
+
+    def _evict(self):
+        for name in list(self._breakers):
+            if len(self._breakers) <= self.max_hosts:
+                return
+            if self._breakers[name].state == CLOSED:
+                del self._breakers[name]
+
+    def states(self):
+        with self._lock:
+            return {name: breaker.state for name, breaker in self._breakers.items()}
+
+
+breakers = BreakerRegistry()
@@ -4,323 +4,619 @@ import certifi
 import requests
 import ipaddress
 import urllib.parse
-import urlunshort3
 import whois
 import csv
+import copy
+import logging
 
 from datetime import datetime
+from typing import NamedTuple
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
-class FeatureExtractor:
+from ai_model import breaker, redirects, resolver, shorteners
+
+logger = logging.getLogger("safesurf.extractor")
+
+_RESOURCE_TAGS = SoupStrainer(['img', 'script', 'link'])
+
+# 특징이 필요로 하는 네트워크 작업(probe). LEXICAL은 URL 문자열만 사용하므로 비용이 없습니다.
+LEXICAL = "lexical"
+DNS = "dns"
+HTTP = "http"
+HTML = "html"
+TLS = "tls"
+WHOIS = "whois"
+
+# 각 probe가 먼저 필요로 하는 probe 목록입니다. 특징 값은 모든 probe가 끝난 뒤 계산하므로,
+# HTTP probe가 실행되어 https → http로 바뀐 경우 URL 기반 특징과 TLS도 바뀐 URL을 기준으로 합니다.
+PROBE_DEPENDENCIES = {
+    DNS: (),
+    HTTP: (DNS,),
+    HTML: (HTTP,),
+    TLS: (HTTP,),
+    WHOIS: (),
+}
+PROBE_ORDER = (DNS, HTTP, HTML, TLS, WHOIS)
+
+# upstream의 circuit breaker가 열려 probe를 건너뛴 경우 해당 특징에 넣는 중립값입니다.
+# 0은 정상(1)과 악성(-1)의 중간이므로, 장애 자체가 판정을 어느 쪽으로도 밀지 않습니다.
+# WHOIS 장애 → Domain_Age, 대상 호스트 장애 → Redirects·External_Favicon·Request_URL_Ratio·SSL_Certificate
+NEUTRAL_VALUES = {
+    "Domain_Age": 0,
+    "Redirects": 0,
+    "External_Favicon": 0,
+    "Request_URL_Ratio": 0,
+    "SSL_Certificate": 0,
+}
+
+BLACKLIST_PATH = "blacklist.csv"
+
+def parse_html_features(html, hostname):
     """
-    @class Feature
-    @brief url에 대하여 특징을 추출하는 클래스
+    @brief
+    HTML을 한 번만 파싱하여 favicon 경로와 외부 리소스 비율 특징을 함께 계산하는 함수입니다.
+    CPU 비중이 큰 단계이므로 프로세스 풀에서 실행될 수 있도록 모듈 수준의 순수 함수로 둡니다.
+    @return (using_external_favicon, request_url) 튜플
     """
-    def __init__(self):
-        self.timeout    = 5
-        self.url        = None
-        self.domain     = None
-        self.hostname   = None
-        self.port       = None
-        self.scheme     = None
-        self.response   = None
-        self.html       = None
-
-    def run(self, url: str):
-        raw_url = url.strip()
-        parsed = urllib.parse.urlparse(raw_url)
-        candidates = [raw_url]
-        if not parsed.scheme:
-            candidates = [f"https://{raw_url}", f"http://{raw_url}"]
-
-        selected_parse = None
-        for candidate in candidates:
-            parsed_candidate = urllib.parse.urlparse(candidate)
-            if parsed_candidate.hostname:
-                selected_parse = parsed_candidate
-                self.url = candidate
-                break
-
-        if not selected_parse:
-            print(f"Invalid URL : {url}")
-            return None
-
-        self.domain = selected_parse.netloc
-        self.hostname = selected_parse.hostname
-        self.scheme = selected_parse.scheme
-        self.port = selected_parse.port if selected_parse.port else (443 if self.scheme == "https" else 80)
-
-        # DNS resolution check before making the request
-        try:
-            socket.gethostbyname(self.hostname)
-        except socket.gaierror:
-            print(f"{url} DNS resolution failed.")
-            return None
+    soup = BeautifulSoup(html, 'html.parser', parse_only=_RESOURCE_TAGS)
 
-        try:
-            self.response   = requests.get(url=self.url, timeout=self.timeout)
-            self.html       = self.response.text
-        except Exception as e:
-            if self.scheme == "https":
-                http_parse = selected_parse._replace(scheme="http", netloc=self.domain)
-                http_url = urllib.parse.urlunparse(http_parse)
-                try:
-                    self.scheme = "http"
-                    self.port = selected_parse.port if selected_parse.port else 80
-                    self.url = http_url
-                    self.response = requests.get(url=http_url, timeout=self.timeout)
-                    self.html = self.response.text
-                except Exception as inner_e:
-                    print(f"{url} Connection Error : {inner_e}")
-                    self.html = None
-                    return None
-            else:
-                print(f"{url} Connection Error : {e}")
-                self.html = None
-                return None
-
-        return [
-            self.having_ip_address(),
-            self.url_length(),
-            self.shortening_service(),
-            self.count_at_symbol(),
-            self.count_double_slash(),
-            self.count_hyphens_in_domain(),
-            self.having_multi_sub_domains(),
-            self.non_verified_https(),
-            self.using_external_favicon(),
-            self.using_non_standard_port(),
-            self.https_token(),
-            self.domain_age(),
-            self.request_url(),
-            self.check_blacklist(),
-            self.count_redirects()
-        ]
-
-    def having_ip_address(self):
-        """
-        @brief
-        url의 hostname이 IP 주소 체계인지 검사하는 함수입니다.
-        정상 : hostname이 IP 주소 체계가 아닌 경우
-        악성 : hostname이 IP 주소 체계인 경우
-        @return 정상이면 1, 악성이면 -1
-        """
-        try:
-            ipaddress.ip_address(address=self.hostname)
-            return -1
-        except ValueError:
-            return 1
+    favicon_link = soup.find('link', rel='icon') or soup.find('link', rel='shortcut icon')
+    if favicon_link is not None:
+        favicon_url = favicon_link.get('href', '')
+        favicon = 1 if favicon_url.startswith("/") or hostname in favicon_url else -1
+    else:
+        favicon = 0
 
-    def url_length(self):
-        """
-        @brief
-        url의 길이를 검사하는 함수입니다.
-        정상 : url의 길이가 54미만일 경우
-        의심 : url의 길이가 54이상이며 75이하일 경우
-        악성 : url의 길이가 75초과일 경우
-        @return 정상이면 1, 의심이면 0, 악성이면 -1
-        """
-        return 1 if len(self.url) < 54 else (0 if 54 <= len(self.url) and len(self.url) <= 75 else -1)
-    
-    def shortening_service(self):
-        """
-        @breif
-        단축 url 서비스를 사용하는 지 검사하는 함수입니다.
-        정상 : 단축 url 서비스를 사용하지 않는 경우
-        악성 : 단축 url 서비스를 사용하는 경우
-        @return 정상이면 1, 악성이면 -1
-        """
-        try: 
-            tiny_url    = urlunshort3.UrlUnshortener()
-            return -1 if tiny_url.is_shortened(self.url) else 1
-        except:
-            return -1
-        
-    def count_at_symbol(self):
-        """
-        @brief
-        '@' 심볼의 등장 횟수를 반환하는 함수입니다.
-        @return int: '@' 심볼 등장 횟수
-        """
-        return self.url.count("@")
-    
-    def count_double_slash(self):
-        """
-        @brief
-        8번째 인덱스 이후에서 등장하는 '//' 쌍의 개수를 반환하는 함수입니다.
-        (스킴 부분 제외)
-        """
-        return self.url[8:].count("//")
-    
-    def count_hyphens_in_domain(self):
-        """
-        @brief
-        도메인에 등장하는 '-' 하이픈 수를 반환하는 함수입니다.
-        @return int: '-' 등장 횟수
-        """
-        return self.domain.count("-")
-    
-    def having_multi_sub_domains(self):
+    tags = soup.find_all(['img', 'script', 'link'])
+    total = len(tags)
+    if total == 0:
+        return favicon, 1
+
+    internal = 0
+    for tag in tags:
+        attr = tag.get('src') or tag.get('href')
+        if attr:
+            if hostname in attr or attr.startswith('/') or attr.startswith('.'):
+                internal += 1
+
+    ratio = internal / total
+    return favicon, (1 if ratio >= 0.61 else (0 if 0.31 <= ratio <= 0.6 else -1))
+
+def whois_dates(hostname):
+    """
+    @brief
+    WHOIS 서버에 직접 질의하여 도메인의 (생성일, 만료일)을 반환하는 함수입니다.
+    python-whois(whois.whois)와 whois 패키지(whois.query) 모두를 지원합니다.
+    @return (creation_date, expiration_date) 튜플, 값이 없으면 None
+    """
+    if hasattr(whois, "whois"):
+        domain_info = whois.whois(hostname)
+    else:
+        domain_info = whois.query(hostname)
+    if domain_info is None:
+        return None, None
+    creation_date = domain_info.creation_date
+    expiration_date = domain_info.expiration_date
+
+    # 일부 도메인은 날짜가 리스트로 반환됨
+    if isinstance(creation_date, list):
+        creation_date = creation_date[0]
+    if isinstance(expiration_date, list):
+        expiration_date = expiration_date[0]
+    return creation_date, expiration_date
+
+class UrlContext:
+    """
+    @class UrlContext
+    @brief URL 하나를 분석하는 동안의 상태를 담는 객체
+    응답 본문과 Response 객체는 보관하지 않고, 특징 계산에 필요한 값(리다이렉트 체인, HTML 특징)만 남깁니다.
+    HTML 원문은 HTML probe가 파싱한 직후 버립니다.
+    """
+    __slots__ = (
+        "url", "domain", "hostname", "port", "scheme", "addresses",
+        "html", "html_features", "redirects", "redirect_chain", "tls", "registration", "expanded_url",
+        "degraded", "imputed",
+    )
+
+    def __init__(self, url, parsed):
+        self.url = url
+        self.domain = parsed.netloc
+        self.hostname = parsed.hostname
+        self.scheme = parsed.scheme
+        self.port = parsed.port if parsed.port else (443 if self.scheme == "https" else 80)
+        self.addresses = None
+        self.html = None
+        self.html_features = None
+        self.redirects = None
+        self.redirect_chain = None
+        self.tls = None
+        self.registration = None
+        self.expanded_url = None
+        # circuit breaker나 속도 제한 때문에 건너뛴 probe. 이 probe에 기대는 특징은 NEUTRAL_VALUES로 채웁니다.
+        self.degraded = set()
+        # 마감 시간 안에 끝나지 않은 probe. 이 probe에 기대는 특징은 학습 데이터의 기본값으로 채웁니다.
+        self.imputed = set()
+
+    def snapshot(self):
         """
-        @breif
-        sub domain의 갯수를 검사하는 함수입니다.
-        정상 : sub domain의 개수가 1개 이하일 경우
-        의심 : sub domain의 개수가 2개일 경우
-        악성 : sub domain의 개수가 3개 이상일 경우
-        @return 정상이면 1, 의심이면 0, 악성이면 -1
+        @brief 추출 중인 스레드가 원본을 계속 고치므로, 다른 스레드가 특징 계산에 쓸 사본을 만듭니다.
         """
-        subdomain_count = len(self.domain.split(".")) - 2
-        return 1 if subdomain_count <= 1 else (0 if subdomain_count == 2 else -1)
-    
-    def non_verified_https(self):
+        clone = copy.copy(self)
+        clone.degraded = set(self.degraded)
+        clone.imputed = set(self.imputed)
+        return clone
+
+
+class Progress:
+    """
+    @class Progress
+    @brief 다른 스레드에서 진행 중인 추출의 중간 상태
+    추출하는 스레드가 probe를 하나 끝낼 때마다 ctx 사본과 끝난 probe 목록을 한 번에 바꿔 넣으므로,
+    기다리던 스레드는 언제 읽어도 서로 맞는 두 값을 봅니다.
+    """
+    __slots__ = ("state",)
+
+    def __init__(self):
+        self.state = None
+
+    def publish(self, ctx, finished):
+        self.state = (ctx.snapshot(), frozenset(finished))
+
+
+class Feature(NamedTuple):
+    name: str
+    func: object
+    probes: tuple
+
+
+FEATURES = {}
+
+
+def feature(name, *probes):
+    """
+    @brief 특징 함수를 레지스트리에 등록하는 데코레이터입니다.
+    등록 순서가 모델 입력 순서(inference.FEATURE_NAMES)와 같아야 합니다.
+    @param probes 이 특징이 필요로 하는 probe 목록 (LEXICAL, DNS, HTTP, HTML, TLS, WHOIS)
+    """
+    def register(func):
+        FEATURES[name] = Feature(name, func, tuple(p for p in probes if p != LEXICAL))
+        return func
+    return register
+
+
+def plan(names):
+    """
+    @brief 선택한 특징들이 필요로 하는 probe만 의존 관계를 포함해 실행 순서대로 반환합니다.
+    @return probe 이름 튜플
+    """
+    needed = set()
+    pending = [probe for name in names for probe in FEATURES[name].probes]
+    while pending:
+        probe = pending.pop()
+        if probe not in needed:
+            needed.add(probe)
+            pending.extend(PROBE_DEPENDENCIES[probe])
+    return tuple(probe for probe in PROBE_ORDER if probe in needed)
+
+
+def features_using(probes):
+    """
+    @brief probe 집합을 받아 그중 하나라도 필요로 하는 특징 이름을 등록 순서대로 반환합니다.
+    건너뛰거나(degraded) 마감에 걸린(imputed) probe 때문에 대체 값으로 채워진 특징을 찾을 때 씁니다.
+    """
+    return [name for name, feature in FEATURES.items() if any(probe in probes for probe in feature.probes)]
+
+
+def parse_url(url):
+    """
+    @brief 스킴이 없으면 https, http 순서로 붙여 hostname이 있는 첫 후보를 고릅니다.
+    @return UrlContext, 유효하지 않으면 None
+    """
+    raw_url = url.strip()
+    parsed = urllib.parse.urlparse(raw_url)
+    candidates = [raw_url]
+    if not parsed.scheme:
+        candidates = [f"https://{raw_url}", f"http://{raw_url}"]
+
+    for candidate in candidates:
+        parsed_candidate = urllib.parse.urlparse(candidate)
+        if parsed_candidate.hostname:
+            return UrlContext(candidate, parsed_candidate)
+    return None
+
+
+class FeatureExtractor:
+    """
+    @class FeatureExtractor
+    @brief url에 대하여 특징을 추출하는 클래스
+    인스턴스에는 설정만 들어 있고 요청별 상태는 UrlContext에 담기므로, 하나의 인스턴스를 여러 스레드가 공유할 수 있습니다.
+    @param html_parser (html, hostname)을 받아 parse_html_features 결과를 돌려주는 함수.
+           지정하지 않으면 현재 프로세스에서 바로 파싱합니다.
+    @param whois_lookup hostname을 받아 (생성일, 만료일)을 돌려주는 함수.
+           지정하지 않으면 whois_dates로 WHOIS 서버에 직접 질의합니다.
+           속도 제한 때문에 조회하지 못하면 breaker.Throttled를 발생시키고, 그 probe는 breaker에 세지 않고 건너뜁니다.
+    @param breakers upstream별 circuit breaker 저장소(기본값: breaker.breakers).
+           WHOIS와 대상 호스트(HTTP/TLS)가 연속으로 실패하면 기다리지 않고 중립값을 씁니다.
+    @param defaults 끝나지 않은 probe의 특징을 채울 {특징 이름: 값}을 돌려주는 함수(예: inference.feature_defaults).
+           지정하지 않으면 NEUTRAL_VALUES를 씁니다.
+    """
+    __slots__ = ("timeout", "html_parser", "whois_lookup", "breakers", "defaults")
+
+    def __init__(self, html_parser=None, whois_lookup=None, timeout=5, breakers=None, defaults=None):
+        self.timeout = timeout
+        self.html_parser = html_parser or parse_html_features
+        self.whois_lookup = whois_lookup or whois_dates
+        self.breakers = breakers or breaker.breakers
+        self.defaults = defaults or (lambda: NEUTRAL_VALUES)
+
+    def extract(self, url: str, names=None, progress=None):
         """
-        @brief
-        HTTPS의 사용 여부와 인증서를 검사하는 함수입니다.
-        정상 : 인증서의 발급자가 신뢰할 수 있으며 유효기간이 1년이상인 경우
-        의심 : 인증서의 발급자가 신뢰할 수 없는 경우
-        악성 : HTTPS를 미사용하는 경우
-        @param url 검사할 url
-        @return 정상이면 1, 의심이면 0, 악성이면 -1
+        @brief 선택한 특징(기본값: 전체)을 계산합니다. 필요한 probe만 실행합니다.
+        breaker가 열린 upstream의 probe(와 그에 의존하는 probe)는 건너뛰고 ctx.degraded에 기록합니다.
+        @param progress 지정하면 probe가 끝날 때마다 중간 상태를 기록합니다(partial 참고).
+        @return (features, ctx) 튜플. DNS/HTTP probe가 실패하면 features는 None
         """
-        if self.scheme != "https":
-            return 0
+        names = list(FEATURES) if names is None else names
+        ctx = parse_url(url)
+        if ctx is None:
+            logger.info("invalid url", extra={"url": url})
+            return None, None
 
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(self.timeout)
-        sock.connect((self.hostname, self.port))
-        context = ssl.create_default_context(cafile=certifi.where())
-        try:
-            wrapped = context.wrap_socket(sock, server_hostname=self.hostname)
-            wrapped.close()
-            return 1
-        except ssl.SSLCertVerificationError as e:
-            return 0
-        except ssl.SSLError:
-            return -1
-        finally:
-            sock.close()
-        
-    def using_external_favicon(self):
+        finished = []
+        for probe in plan(names):
+            if any(dependency in ctx.degraded for dependency in PROBE_DEPENDENCIES[probe]):
+                ctx.degraded.add(probe)
+                continue
+            if not getattr(self, f"_probe_{probe}")(ctx, url):
+                return None, ctx
+            finished.append(probe)
+            if progress is not None:
+                progress.publish(ctx, finished)
+
+        return [self._feature_value(name, ctx) for name in names], ctx
+
+    def partial(self, url: str, progress=None, names=None):
         """
         @brief
-        favicon의 로드 경로를 검사하는 함수입니다.
-        정상 : 같은 도메인에서 favicon 로드하는 경우
-        의심 : favicon이 없는 경우
-        악성 : 외부에서 favicon 로드하는 경우
-        @return 정상이면 1, 의심이면 0, 악성이면 -1
+        다른 스레드의 extract가 끝나기를 더 기다릴 수 없을 때, 그때까지 끝난 probe만으로 특징을 계산합니다.
+        끝나지 않은 probe는 ctx.imputed에 기록하고, 그 특징은 defaults로 채웁니다.
+        @param progress extract에 넘긴 Progress. 없거나 아직 끝난 probe가 없으면 URL만으로 계산합니다.
+        @return (features, ctx) 튜플. 유효하지 않은 URL이면 (None, None)
         """
-        soup = BeautifulSoup(self.html, 'html.parser')
-        favicon_link = soup.find('link', rel='icon') or soup.find('link', rel='shortcut icon')
-        if favicon_link is not None:
-            favicon_url = favicon_link.get('href', '')
-            return 1 if favicon_url.startswith("/") or self.hostname in favicon_url else -1
+        names = list(FEATURES) if names is None else names
+        state = progress.state if progress is not None else None
+        if state is None:
+            ctx, finished = parse_url(url), frozenset()
+            if ctx is None:
+                return None, None
         else:
-            return 0
-        
-    def using_non_standard_port(self):
-        """
-        @brief
-        표준 포트(80, 443, 8080)를 검사하는 함수입니다.
-        정상 : 일반적인 포트를 사용하는 경우
-        악성 : 일반적이지 않은 포트를 사용하는 경우
-        @return 정상이면 1, 악성이면 -1
-        """
-        return 1 if self.port in [80, 443, 8080] else -1
-    
-    def https_token(self):
-        """
-        @brief
-        URL의 도메인 부분에서 https를 사용하는 지 검사하는 함수입니다.
-        정상 : 도메인 부분에서 https를 사용하지 않는 경우
-        악성 : 도메인 부분에서 https를 사용하는 경우
-        @return 정상이면 1, 악성이면 -1
-        """
-        return -1 if "https" in self.domain.lower() else 1
-    
-    def domain_age(self):
-        """
-        @brief
-        도메인의 수명을 검사하는 함수입니다.
-        정상 : 도메인의 나이가 1년 이상인 경우
-        의심 : 도메인의 나이가 1년 미만이며 6개월 이상인 경우
-        악성 : 도메인의 나이가 6개월 미만인 경우
-        @return 정상이면 1, 의심이면 0, 악성이면 -1
-        """
-        try:
-            domain_info = whois.whois(self.hostname)
-            creation_date = domain_info.creation_date
-            expiration_date = domain_info.expiration_date
+            ctx, finished = state[0].snapshot(), state[1]
+        ctx.imputed = set(plan(names)) - finished - ctx.degraded
+        return [self._feature_value(name, ctx) for name in names], ctx
+
+    def _feature_value(self, name, ctx):
+        feature = FEATURES[name]
+        if ctx.degraded and any(probe in ctx.degraded for probe in feature.probes):
+            return NEUTRAL_VALUES[name]
+        if ctx.imputed and any(probe in ctx.imputed for probe in feature.probes):
+            return self.defaults().get(name, NEUTRAL_VALUES.get(name, 0))
+        return feature.func(ctx)
 
-          # 일부 도메인은 날짜가 리스트로 반환됨
-            if isinstance(creation_date, list):
-                creation_date = creation_date[0]
-            if isinstance(expiration_date, list):
-                expiration_date = expiration_date[0]
+    def run(self, url: str, names=None):
+        return self.extract(url, names)[0]
 
-            if not creation_date or not expiration_date:
-                return -1
+    def _probe_dns(self, ctx, url):
+        # 조회 결과는 캐시되어 이후 HTTP/TLS 연결에서도 같은 IP로 재사용됩니다.
+        try:
+            ctx.addresses = resolver.resolve(ctx.hostname)
+        except socket.gaierror:
+            logger.info("dns resolution failed", extra={"url": url, "hostname": ctx.hostname})
+            return False
+        return True
 
-            age_days = (expiration_date - creation_date).days
-            return 1 if age_days >= 365 else (0 if 180 <= age_days < 365 else -1)
+    def _probe_http(self, ctx, url):
+        host_breaker = self.breakers.for_host(ctx.hostname)
+        if not host_breaker.allow():
+            ctx.degraded.add(HTTP)
+            return True
+        # 리다이렉트는 redirects.follow가 홉 수 제한·루프 검사·중간 호스트 캐시를 적용하며 따라갑니다.
+        try:
+            chain = redirects.follow(ctx.url, timeout=self.timeout)
         except Exception as e:
-            return -1
-    
-    def request_url(self):
-        """
-        @brief
-        도메인에 외부 주소가 포함되는 지 검사하는 함수입니다.
-        정상 : 도메인에 외부 주소가 포함되지 않는 경우
-        의심 : 도메인에 외부 주소가 포함되는 경우
-        악성 : 도메인에 외부 주소가 포함되는 경우
-        @return 정상이면 1, 의심이면 0, 악성이면 -1
-        """
-        soup = BeautifulSoup(self.html, 'html.parser')
-        tags = soup.find_all(['img', 'script', 'link'])
-
-        total = len(tags)
-        if total == 0:
-            return 1
-
-        internal = 0
-        for tag in tags:
-            attr = tag.get('src') or tag.get('href')
-            if attr:
-                if self.hostname in attr or attr.startswith('/') or attr.startswith('.'):
-                    internal += 1
-
-        ratio = internal / total
-        return 1 if ratio >= 0.61 else (0 if 0.31 <= ratio <= 0.6 else -1)
-    
-    def check_blacklist(self, blacklist_path="blacklist.csv"):
-        """
-        @brief
-        도메인이 블랙리스트에 포함되는 지 검사하는 함수입니다.
-        정상 : 도메인이 블랙리스트에 포함되지 않는 경우
-        악성 : 도메인이 블랙리스트에 포함되는 경우
-        @return 정상이면 1, 악성이면 -1
-        """
+            if ctx.scheme != "https":
+                host_breaker.record_failure()
+                logger.info("connection error", extra={"url": url, "error": str(e)})
+                return False
+            parsed = urllib.parse.urlparse(ctx.url)
+            ctx.scheme = "http"
+            ctx.port = parsed.port if parsed.port else 80
+            ctx.url = urllib.parse.urlunparse(parsed._replace(scheme="http"))
+            try:
+                chain = redirects.follow(ctx.url, timeout=self.timeout)
+            except Exception as inner_e:
+                host_breaker.record_failure()
+                logger.info("connection error", extra={"url": url, "error": str(inner_e)})
+                return False
+        host_breaker.record_success()
+        ctx.html = chain.response.text if chain.response is not None else ""
+        chain.response = None
+        ctx.redirects = chain.redirects
+        ctx.redirect_chain = chain
+        if shorteners.is_shortened(ctx.url):
+            ctx.expanded_url = chain.final_url
+        return True
+
+    def _probe_html(self, ctx, url):
+        ctx.html_features = self.html_parser(ctx.html, ctx.hostname)
+        ctx.html = None
+        return True
+
+    def _probe_tls(self, ctx, url):
+        if ctx.scheme != "https":
+            ctx.tls = 0
+            return True
+        host_breaker = self.breakers.for_host(ctx.hostname)
+        if not host_breaker.allow():
+            ctx.degraded.add(TLS)
+            return True
         try:
-            with open(blacklist_path, newline='') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if self.domain in row or self.url in row:
-                        return -1
-            return 1
-        except:
-            return 1
-        
-    def count_redirects(self):
-        """
-        @brief
-        도메인에 리다이렉트가 포함되는 지 검사하는 함수입니다.
-        정상 : 도메인에 리다이렉트가 1개 이하 포함되는 경우
-        의심 : 도메인에 리다이렉트가 2, 3개 포함되는 경우
-        악성 : 도메인에 리다이렉트가 4개 이상 포함되는 경우
-        @return 정상이면 1, 의심이면 0, 악성이면 -1
-        """
+            ctx.tls = verify_certificate(ctx.hostname, ctx.port, ctx.scheme, self.timeout)
+        except OSError as e:
+            host_breaker.record_failure()
+            logger.info("tls connection failed", extra={"url": url, "error": str(e)})
+            # 실제로 연결해 본 결과이므로 중립값이 아니라 SSL 오류 값(-1)으로 기록합니다.
+            ctx.tls = -1
+            return True
+        host_breaker.record_success()
+        return True
+
+    def _probe_whois(self, ctx, url):
+        whois_breaker = self.breakers.get("whois")
+        if not whois_breaker.allow():
+            ctx.degraded.add(WHOIS)
+            return True
         try:
-            redirects = len(self.response.history)
-            return 1 if redirects <= 1 else (0 if redirects <= 3 else -1)
-        except:
+            ctx.registration = self.whois_lookup(ctx.hostname)
+        except breaker.Throttled:
+            ctx.degraded.add(WHOIS)
+            return True
+        except Exception:
+            whois_breaker.record_failure()
+            ctx.registration = (None, None)
+        else:
+            whois_breaker.record_success()
+        return True
+
+
+def verify_certificate(hostname, port, scheme, timeout):
+    """
+    @brief
+    HTTPS의 사용 여부와 인증서를 검사하는 함수입니다.
+    @return 신뢰할 수 있으면 1, 인증서 검증 실패면 0, https가 아니면 0, 그 밖의 SSL 오류면 -1
+    """
+    if scheme != "https":
+        return 0
+
+    sock = resolver.create_connection((hostname, port), timeout=timeout)
+    context = ssl.create_default_context(cafile=certifi.where())
+    try:
+        wrapped = context.wrap_socket(sock, server_hostname=hostname)
+        wrapped.close()
+        return 1
+    except ssl.SSLCertVerificationError as e:
+        return 0
+    except ssl.SSLError:
+        return -1
+    finally:
+        sock.close()
+
+
+@feature("IP_Address", LEXICAL)
+def having_ip_address(ctx):
+    """
+    @brief
+    url의 hostname이 IP 주소 체계인지 검사하는 함수입니다.
+    정상 : hostname이 IP 주소 체계가 아닌 경우
+    악성 : hostname이 IP 주소 체계인 경우
+    @return 정상이면 1, 악성이면 -1
+    """
+    try:
+        ipaddress.ip_address(address=ctx.hostname)
+        return -1
+    except ValueError:
+        return 1
+
+
+@feature("URL_Length", LEXICAL)
+def url_length(ctx):
+    """
+    @brief
+    url의 길이를 검사하는 함수입니다.
+    정상 : url의 길이가 54미만일 경우
+    의심 : url의 길이가 54이상이며 75이하일 경우
+    악성 : url의 길이가 75초과일 경우
+    @return 정상이면 1, 의심이면 0, 악성이면 -1
+    """
+    return 1 if len(ctx.url) < 54 else (0 if 54 <= len(ctx.url) and len(ctx.url) <= 75 else -1)
+
+
+@feature("Shortening_Service", LEXICAL)
+def shortening_service(ctx):
+    """
+    @breif
+    단축 url 서비스를 사용하는 지 검사하는 함수입니다.
+    정상 : 단축 url 서비스를 사용하지 않는 경우
+    악성 : 단축 url 서비스를 사용하는 경우
+    @return 정상이면 1, 악성이면 -1
+    """
+    # 네트워크를 쓰지 않습니다. 단축 URL의 목적지(expanded_url)는 HTTP probe가 리다이렉트 체인에서 기록합니다.
+    return -1 if shorteners.is_shortened(ctx.url) else 1
+
+
+@feature("At_Symbol_Count", LEXICAL)
+def count_at_symbol(ctx):
+    """
+    @brief
+    '@' 심볼의 등장 횟수를 반환하는 함수입니다.
+    @return int: '@' 심볼 등장 횟수
+    """
+    return ctx.url.count("@")
+
+
+@feature("Double_Slash_Count", LEXICAL)
+def count_double_slash(ctx):
+    """
+    @brief
+    8번째 인덱스 이후에서 등장하는 '//' 쌍의 개수를 반환하는 함수입니다.
+    (스킴 부분 제외)
+    """
+    return ctx.url[8:].count("//")
+
+
+@feature("Hyphen_Count", LEXICAL)
+def count_hyphens_in_domain(ctx):
+    """
+    @brief
+    도메인에 등장하는 '-' 하이픈 수를 반환하는 함수입니다.
+    @return int: '-' 등장 횟수
+    """
+    return ctx.domain.count("-")
+
+
+@feature("Subdomain_Level", LEXICAL)
+def having_multi_sub_domains(ctx):
+    """
+    @breif
+    sub domain의 갯수를 검사하는 함수입니다.
+    정상 : sub domain의 개수가 1개 이하일 경우
+    의심 : sub domain의 개수가 2개일 경우
+    악성 : sub domain의 개수가 3개 이상일 경우
+    @return 정상이면 1, 의심이면 0, 악성이면 -1
+    """
+    subdomain_count = len(ctx.domain.split(".")) - 2
+    return 1 if subdomain_count <= 1 else (0 if subdomain_count == 2 else -1)
+
+
+@feature("SSL_Certificate", TLS)
+def non_verified_https(ctx):
+    """
+    @brief
+    HTTPS의 사용 여부와 인증서를 검사하는 함수입니다.
+    정상 : 인증서의 발급자가 신뢰할 수 있으며 유효기간이 1년이상인 경우
+    의심 : 인증서의 발급자가 신뢰할 수 없는 경우
+    악성 : HTTPS를 미사용하는 경우
+    @return 정상이면 1, 의심이면 0, 악성이면 -1
+    """
+    return ctx.tls
+
+
+@feature("External_Favicon", HTML)
+def using_external_favicon(ctx):
+    """
+    @brief
+    favicon의 로드 경로를 검사하는 함수입니다.
+    정상 : 같은 도메인에서 favicon 로드하는 경우
+    의심 : favicon이 없는 경우
+    악성 : 외부에서 favicon 로드하는 경우
+    @return 정상이면 1, 의심이면 0, 악성이면 -1
+    """
+    return ctx.html_features[0]
+
+
+@feature("Non_Standard_Port", LEXICAL)
+def using_non_standard_port(ctx):
+    """
+    @brief
+    표준 포트(80, 443, 8080)를 검사하는 함수입니다.
+    정상 : 일반적인 포트를 사용하는 경우
+    악성 : 일반적이지 않은 포트를 사용하는 경우
+    @return 정상이면 1, 악성이면 -1
+    """
+    return 1 if ctx.port in [80, 443, 8080] else -1
+
+
+@feature("HTTPS_Token", LEXICAL)
+def https_token(ctx):
+    """
+    @brief
+    URL의 도메인 부분에서 https를 사용하는 지 검사하는 함수입니다.
+    정상 : 도메인 부분에서 https를 사용하지 않는 경우
+    악성 : 도메인 부분에서 https를 사용하는 경우
+    @return 정상이면 1, 악성이면 -1
+    """
+    return -1 if "https" in ctx.domain.lower() else 1
+
+
+@feature("Domain_Age", WHOIS)
+def domain_age(ctx):
+    """
+    @brief
+    도메인의 수명을 검사하는 함수입니다.
+    정상 : 도메인의 나이가 1년 이상인 경우
+    의심 : 도메인의 나이가 1년 미만이며 6개월 이상인 경우
+    악성 : 도메인의 나이가 6개월 미만인 경우
+    @return 정상이면 1, 의심이면 0, 악성이면 -1
+    """
+    try:
+        creation_date, expiration_date = ctx.registration
+
+        if not creation_date or not expiration_date:
             return -1
+
+        age_days = (expiration_date - creation_date).days
+        return 1 if age_days >= 365 else (0 if 180 <= age_days < 365 else -1)
+    except Exception as e:
+        return -1
+
+
+@feature("Request_URL_Ratio", HTML)
+def request_url(ctx):
+    """
+    @brief
+    도메인에 외부 주소가 포함되는 지 검사하는 함수입니다.
+    정상 : 도메인에 외부 주소가 포함되지 않는 경우
+    의심 : 도메인에 외부 주소가 포함되는 경우
+    악성 : 도메인에 외부 주소가 포함되는 경우
+    @return 정상이면 1, 의심이면 0, 악성이면 -1
+    """
+    return ctx.html_features[1]
+
+
+@feature("Blacklist", LEXICAL)
+def check_blacklist(ctx, blacklist_path=BLACKLIST_PATH):
+    """
+    @brief
+    도메인이 블랙리스트에 포함되는 지 검사하는 함수입니다.
+    정상 : 도메인이 블랙리스트에 포함되지 않는 경우
+    악성 : 도메인이 블랙리스트에 포함되는 경우
+    @return 정상이면 1, 악성이면 -1
+    """
+    try:
+        with open(blacklist_path, newline='') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if ctx.domain in row or ctx.url in row:
+                    return -1
+        return 1
+    except:
+        return 1
+
+
+@feature("Redirects", HTTP)
+def count_redirects(ctx):
+    """
+    @brief
+    도메인에 리다이렉트가 포함되는 지 검사하는 함수입니다.
+    정상 : 도메인에 리다이렉트가 1개 이하 포함되는 경우
+    의심 : 도메인에 리다이렉트가 2, 3개 포함되는 경우
+    악성 : 도메인에 리다이렉트가 4개 이상 포함되거나, 루프 또는 홉 제한에 걸린 경우
+    @return 정상이면 1, 의심이면 0, 악성이면 -1
+    """
+    redirects = ctx.redirects
+    if redirects is None:
+        return -1
+    chain = ctx.redirect_chain
+    if chain is not None and (chain.loop or chain.truncated):
+        return -1
+    return 1 if redirects <= 1 else (0 if redirects <= 3 else -1)
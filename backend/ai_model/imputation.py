@@ -0,0 +1,66 @@
+### backend/ai_model/imputation.py
+
+import numpy as np
+
+
+def value_domain(name):
+    """
+    @brief 특징이 가질 수 있는 대표값. 개수 특징(*_Count)은 0, 1, 2+ 이고 나머지는 -1, 0, 1 입니다.
+    """
+    return (0, 1, 2) if name.endswith("_Count") else (-1, 0, 1)
+
+
+def training_modes(X, names):
+    """
+    @brief 학습 데이터에서 특징별 최빈값을 구합니다(train_model.py가 모델 보고서에 기록).
+    @param X 특징 이름을 열로 가진 DataFrame
+    @return {특징 이름: 최빈값}
+    """
+    return {name: int(X[name].mode().iloc[0]) for name in names}
+
+
+def forest_modes(forest, names):
+    """
+    @brief
+    학습 데이터가 없을 때 트리 구조만으로 특징별 최빈값을 추정합니다.
+    트리마다 리프까지 내려가며 해당 특징의 분기 조건으로 값의 구간을 좁히고, 리프의 학습 표본 수를
+    구간에 남은 대표값들에 고르게 나눠 더합니다. 한 번도 분기에 쓰이지 않은 특징은 어떤 값을 넣어도
+    예측이 같으므로, 최빈값이 하나로 정해지지 않으면 중립값 0을 씁니다.
+    @return {특징 이름: 추정 최빈값}
+    """
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    modes = {}
+    for index, name in enumerate(names):
+        domain = np.asarray(value_domain(name), dtype=float)
+        weights = np.zeros(len(domain))
+        for tree in trees:
+            stack = [(0, -np.inf, np.inf)]
+            while stack:
+                node, low, high = stack.pop()
+                left, right = tree.children_left[node], tree.children_right[node]
+                if left == -1:
+                    inside = (domain > low) & (domain <= high)
+                    if inside.any():
+                        weights[inside] += tree.weighted_n_node_samples[node] / inside.sum()
+                    continue
+                if tree.feature[node] == index:
+                    threshold = tree.threshold[node]
+                    stack.append((left, low, min(high, threshold)))
+                    stack.append((right, max(low, threshold), high))
+                else:
+                    stack.append((left, low, high))
+                    stack.append((right, low, high))
+        best = np.flatnonzero(np.isclose(weights, weights.max()))
+        modes[name] = int(domain[best[0]]) if len(best) == 1 else 0
+    return modes
+
+
+def importance_weights(model, names):
+    """
+    @brief 특징별 중요도(합 1). feature_importances_가 없는 모델은 모든 특징을 같은 비중으로 봅니다.
+    """
+    importances = getattr(model, "feature_importances_", None)
+    if importances is None or not np.sum(importances):
+        return {name: 1 / len(names) for name in names}
+    importances = np.asarray(importances, dtype=float) / np.sum(importances)
+    return dict(zip(names, importances.tolist()))
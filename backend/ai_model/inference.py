@@ -0,0 +1,192 @@
+### backend/ai_model/inference.py
+
+import os
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# joblib/pandas/scikit-learn과 HTML 파서는 import 비용이 커서 처음 필요할 때 불러옵니다.
+
+logger = logging.getLogger("safesurf.inference")
+
+FEATURE_NAMES = [
+    "IP_Address", "URL_Length", "Shortening_Service", "At_Symbol_Count", "Double_Slash_Count",
+    "Hyphen_Count", "Subdomain_Level", "SSL_Certificate", "External_Favicon", "Non_Standard_Port",
+    "HTTPS_Token", "Domain_Age", "Request_URL_Ratio", "Blacklist", "Redirects"
+]
+RESULT_MAP = {-1: "phishing", 0: "suspicious", 1: "legitimate"}
+
+MODEL_PATH = os.getenv("MODEL_PATH", "assets/rf_model_optimized.pkl")
+# 0이면 요청 스레드에서 바로 실행하고, "auto"면 CPU 코어 수만큼 워커 프로세스를 띄웁니다.
+PROCESS_WORKERS = os.getenv("ANALYSIS_PROCESS_WORKERS", "0")
+# 풀은 첫 작업 때 만들어지는데, 그때는 로그 리스너·스레드 풀·prewarm 스레드가 이미 돌고 있습니다.
+# 스레드가 있는 프로세스를 fork하면 다른 스레드가 잡고 있던 락 때문에 워커가 멈출 수 있으므로,
+# 기본값은 깨끗한 서버 프로세스에서 워커를 만드는 forkserver입니다. 워커는 초기화 때 모델을 mmap으로 엽니다.
+PROCESS_START_METHOD = os.getenv("ANALYSIS_PROCESS_START_METHOD", "forkserver")
+
+_model = None
+_model_lock = threading.Lock()
+_explainer = None
+_defaults = None
+_importances = None
+_pool = None
+
+
+def load_model(path=MODEL_PATH, mmap_mode=None):
+    """Load the classifier once per process; pool workers open it with ``mmap_mode="r"``."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import joblib
+
+                _model = joblib.load(path, mmap_mode=mmap_mode)
+    return _model
+
+
+def is_ready():
+    return _model is not None
+
+
+def get_explainer():
+    """트리 앙상블이 아닌 모델(예: 선형 대체 모델)이면 None을 반환합니다."""
+    global _explainer
+    if _explainer is None:
+        from ai_model.attribution import TreeExplainer
+
+        model = load_model()
+        with _model_lock:
+            if _explainer is None and TreeExplainer.supports(model):
+                _explainer = TreeExplainer(model)
+    return _explainer
+
+
+def feature_defaults():
+    """
+    @brief
+    시간 안에 끝나지 않은 probe의 특징을 채울 특징별 기본값(학습 데이터의 최빈값)을 반환합니다.
+    train_model.py가 남긴 모델 보고서({MODEL_PATH}.json)의 feature_defaults를 우선 쓰고,
+    보고서가 없으면 트리 구조에서 추정합니다.
+    """
+    global _defaults
+    if _defaults is None:
+        from ai_model import imputation
+
+        report_path = f"{MODEL_PATH}.json"
+        defaults = None
+        if os.path.exists(report_path):
+            with open(report_path, encoding="utf-8") as f:
+                defaults = json.load(f).get("feature_defaults")
+        if defaults is None:
+            model = load_model()
+            if hasattr(model, "estimators_"):
+                defaults = imputation.forest_modes(model, FEATURE_NAMES)
+            else:
+                defaults = {name: 0 for name in FEATURE_NAMES}
+        _defaults = defaults
+    return _defaults
+
+
+def confidence(imputed):
+    """
+    @brief 실제로 관측한 특징이 모델 중요도에서 차지하는 비율(0~1)을 반환합니다.
+    @param imputed 기본값이나 중립값으로 채운 특징 이름 목록
+    """
+    global _importances
+    if _importances is None:
+        from ai_model import imputation
+
+        _importances = imputation.importance_weights(load_model(), FEATURE_NAMES)
+    return max(0.0, 1.0 - sum(_importances.get(name, 0.0) for name in imputed))
+
+
+def _init_worker(path):
+    # forkserver/spawn 워커는 mmap으로 열어 가중치 배열을 페이지 캐시에서 공유합니다.
+    # (fork를 직접 지정한 경우에는 부모의 모델을 물려받으므로 다시 로드하지 않습니다.)
+    load_model(path, mmap_mode="r")
+
+
+def _predict_local(features):
+    import pandas as pd
+
+    model = load_model()
+    df = pd.DataFrame([features], columns=FEATURE_NAMES)
+    proba = model.predict_proba(df)[0]
+    class_index = int(proba.argmax())
+    prediction = int(model.classes_[class_index])
+    return prediction, float(proba[class_index])
+
+
+def _worker_count():
+    if PROCESS_WORKERS == "auto":
+        return os.cpu_count() or 1
+    return int(PROCESS_WORKERS)
+
+
+def start_pool(workers=None):
+    """Start the CPU worker pool (HTML parsing + inference) if it is configured."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    workers = _worker_count() if workers is None else workers
+    load_model()
+    if workers <= 0:
+        return None
+    start_method = PROCESS_START_METHOD
+    if start_method not in multiprocessing.get_all_start_methods():
+        start_method = "spawn"
+    _pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=_init_worker,
+        initargs=(MODEL_PATH,),
+    )
+    logger.info("cpu pool started", extra={"workers": workers, "start_method": start_method})
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def parse_html(html, hostname):
+    """HTML 기반 특징을 계산합니다. 풀이 있으면 워커 프로세스에 넘깁니다."""
+    from ai_model.extractor import parse_html_features
+
+    if _pool is None:
+        return parse_html_features(html, hostname)
+    return _pool.submit(parse_html_features, html, hostname).result()
+
+
+def explain_batch(rows):
+    """
+    Per-row feature attributions toward each row's predicted class, computed
+    from the tree ensemble in one vectorized pass. Each row becomes a list of
+    ``(feature, value, contribution)`` sorted by contribution, highest first.
+    Returns None when the loaded model is not a tree ensemble.
+    """
+    explainer = get_explainer()
+    if explainer is None or not rows:
+        return None
+    _, _, contributions = explainer.explain(rows)
+    return [
+        sorted(zip(FEATURE_NAMES, row, (round(float(c), 4) for c in contribution)), key=lambda item: -item[2])
+        for row, contribution in zip(rows, contributions)
+    ]
+
+
+def explain(features):
+    explained = explain_batch([features])
+    return explained[0] if explained else None
+
+
+def predict(features):
+    """Return ``(prediction, probability)`` for one 15-feature vector."""
+    if _pool is None:
+        return _predict_local(features)
+    return _pool.submit(_predict_local, features).result()
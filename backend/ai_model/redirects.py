@@ -0,0 +1,193 @@
+### backend/ai_model/redirects.py
+
+import os
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import NamedTuple
+
+import requests
+
+from ai_model import shorteners
+
+logger = logging.getLogger("safesurf.redirects")
+
+REDIRECT_MAX_HOPS = int(os.getenv("REDIRECT_MAX_HOPS", "10"))
+REDIRECT_CACHE_TTL = float(os.getenv("REDIRECT_CACHE_TTL", "3600"))
+REDIRECT_CACHE_SIZE = int(os.getenv("REDIRECT_CACHE_SIZE", "20000"))
+REDIRECTOR_LIST_PATH = os.getenv(
+    "REDIRECTOR_LIST_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "redirectors.txt"),
+)
+
+REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+
+
+class Hop(NamedTuple):
+    url: str
+    status: int
+    elapsed_ms: float
+    cached: bool = False
+
+
+class RedirectChain:
+    """
+    @class RedirectChain
+    @brief 리다이렉트를 따라간 결과
+    hops에는 리다이렉트 응답(3xx)만 들어 있으므로 len(hops)가 예전 len(response.history)와 같습니다.
+    response는 마지막으로 받은 응답이며, 루프/홉 제한으로 멈췄다면 3xx 응답이거나 None일 수 있습니다.
+    본문이 필요 없어지면 response를 None으로 지워도 status는 남습니다.
+    """
+    __slots__ = ("hops", "final_url", "response", "status", "loop", "truncated")
+
+    def __init__(self, hops, final_url, response, loop=False, truncated=False):
+        self.hops = hops
+        self.final_url = final_url
+        self.response = response
+        self.status = response.status_code if response is not None else None
+        self.loop = loop
+        self.truncated = truncated
+
+    @property
+    def redirects(self):
+        return len(self.hops)
+
+    def to_dict(self):
+        return {
+            "hops": [hop._asdict() for hop in self.hops],
+            "final_url": self.final_url,
+            "status": self.status,
+            "loop": self.loop,
+            "truncated": self.truncated,
+        }
+
+
+class _SegmentCache:
+    """
+    @brief 중간 호스트 URL → (건너뛸 홉 목록, 도착 URL) 캐시
+    프로세스 안의 LRU에 먼저 찾고, shared_cache가 있으면 다른 워커가 풀어 둔 구간도 사용합니다.
+    """
+    def __init__(self, ttl, size):
+        self.ttl = ttl
+        self.size = size
+        self.shared_cache = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and entry[1] >= time.monotonic():
+                self._entries.move_to_end(url)
+                return entry[0]
+        if self.shared_cache is not None:
+            data = self.shared_cache.get("redirect", url)
+            if data:
+                payload = json.loads(data)
+                value = ([tuple(hop) for hop in payload["hops"]], payload["landing"])
+                self._store(url, value)
+                return value
+        return None
+
+    def set(self, url, hops, landing):
+        value = (hops, landing)
+        self._store(url, value)
+        if self.shared_cache is not None:
+            data = json.dumps({"hops": hops, "landing": landing}).encode("utf-8")
+            self.shared_cache.set("redirect", url, data, self.ttl)
+
+    def _store(self, url, value):
+        with self._lock:
+            self._entries[url] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+redirectors = shorteners.ShortenerIndex(REDIRECTOR_LIST_PATH)
+cache = _SegmentCache(REDIRECT_CACHE_TTL, REDIRECT_CACHE_SIZE)
+
+
+def is_intermediate(url):
+    """
+    @brief 단축 서비스나 광고/클릭 추적처럼 다른 곳으로 보내기만 하는 호스트인지 검사합니다.
+    """
+    hostname = urllib.parse.urlsplit(url).hostname
+    return shorteners.index.is_shortener_host(hostname) or redirectors.is_shortener_host(hostname)
+
+
+def _remember(hops, final_url):
+    """
+    @brief 중간 호스트에서 시작하는 구간마다, 중간 호스트가 아닌 첫 URL까지의 홉을 캐시합니다.
+    """
+    for start, hop in enumerate(hops):
+        if hop.cached or not is_intermediate(hop.url):
+            continue
+        end = start
+        while end < len(hops) and is_intermediate(hops[end].url):
+            end += 1
+        landing = hops[end].url if end < len(hops) else final_url
+        cache.set(hop.url, [(h.url, h.status) for h in hops[start:end]], landing)
+
+
+def follow(url, timeout=5, max_hops=REDIRECT_MAX_HOPS, method="GET"):
+    """
+    @brief
+    리다이렉트를 한 홉씩 직접 따라갑니다. 전체 체인은 timeout초 안에 끝나야 하며,
+    max_hops를 넘거나 이미 방문한 URL로 돌아오면(루프) 그 자리에서 멈춥니다.
+    중간 호스트 구간은 캐시에서 풀어 네트워크 왕복 없이 건너뛰되, 홉 수에는 그대로 포함합니다.
+    @return RedirectChain. 첫 요청부터 실패하는 등 응답을 받지 못하면 requests 예외를 그대로 올립니다.
+    """
+    deadline = time.monotonic() + timeout
+    hops = []
+    seen = {url}
+    current = url
+    response = None
+    loop = truncated = False
+
+    with requests.Session() as session:
+        while True:
+            segment = cache.get(current) if is_intermediate(current) else None
+            if segment is not None:
+                skipped, landing = segment
+                hops.extend(Hop(hop_url, status, 0.0, True) for hop_url, status in skipped)
+                seen.update(hop_url for hop_url, _ in skipped)
+                if landing in seen:
+                    loop = True
+                    break
+                if len(hops) >= max_hops:
+                    truncated = True
+                    break
+                seen.add(landing)
+                current = landing
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"redirect chain from {url} exceeded {timeout}s")
+            started = time.perf_counter()
+            response = session.request(method, current, allow_redirects=False, timeout=remaining)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            location = response.headers.get("Location")
+            if response.status_code not in REDIRECT_STATUSES or not location:
+                break
+            hops.append(Hop(current, response.status_code, elapsed_ms))
+            next_url = urllib.parse.urljoin(current, location)
+            if next_url in seen:
+                loop = True
+                break
+            if len(hops) >= max_hops:
+                truncated = True
+                break
+            seen.add(next_url)
+            current = next_url
+
+    if loop or truncated:
+        logger.info("redirect chain stopped", extra={"url": url, "hops": len(hops), "loop": loop})
+    else:
+        _remember(hops, current)
+    return RedirectChain(hops, current, response, loop, truncated)
@@ -0,0 +1,210 @@
+### backend/ai_model/resolver.py
+
+import os
+import socket
+import ipaddress
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import dns.resolver
+    import dns.exception
+except ImportError:  # dnspython은 DNS_UPSTREAM을 지정할 때만 필요합니다.
+    dns = None
+
+logger = logging.getLogger("safesurf.resolver")
+
+# 시스템 resolver(getaddrinfo)는 TTL을 알려주지 않으므로 이 값을 사용합니다.
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "60"))
+DNS_NEGATIVE_TTL = float(os.getenv("DNS_NEGATIVE_TTL", "30"))
+DNS_MIN_TTL = float(os.getenv("DNS_MIN_TTL", "5"))
+DNS_MAX_TTL = float(os.getenv("DNS_MAX_TTL", "3600"))
+DNS_TIMEOUT = float(os.getenv("DNS_TIMEOUT", "3"))
+DNS_CACHE_MAX_ENTRIES = int(os.getenv("DNS_CACHE_MAX_ENTRIES", "20000"))
+# "host" 또는 "host:port". 테스트에서는 로컬 stub 서버를 가리킬 수 있습니다.
+DNS_UPSTREAM = os.getenv("DNS_UPSTREAM", "")
+
+_lookup_pool = ThreadPoolExecutor(max_workers=int(os.getenv("DNS_WORKERS", "16")), thread_name_prefix="dns")
+
+
+class CachingResolver:
+    """
+    @class CachingResolver
+    @brief 호스트 이름을 IP 목록으로 변환하고 결과를 TTL 동안 캐시하는 클래스
+    성공 결과는 레코드 TTL(또는 DNS_CACHE_TTL)만큼, 실패 결과는 DNS_NEGATIVE_TTL만큼 캐시하며,
+    A/AAAA 조회는 동시에 수행합니다. 같은 호스트에 대한 동시 조회는 하나로 합칩니다.
+    """
+    def __init__(self, upstream=DNS_UPSTREAM, shared_cache=None):
+        self._entries = {}
+        # 여러 워커 프로세스가 함께 쓰는 캐시(get/set(namespace, key, bytes, ttl)). 없으면 프로세스 안에서만 캐시합니다.
+        self.shared_cache = shared_cache
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._dns = None
+        if upstream:
+            if dns is None:
+                logger.warning("DNS_UPSTREAM is set but dnspython is not installed; using system resolver")
+            else:
+                host, _, port = upstream.partition(":")
+                self._dns = dns.resolver.Resolver(configure=False)
+                self._dns.nameservers = [host]
+                self._dns.port = int(port or 53)
+                self._dns.lifetime = DNS_TIMEOUT
+
+    def resolve(self, hostname):
+        """
+        @brief hostname의 IP 주소 목록(IPv4 우선)을 반환합니다.
+        @return list[str]
+        @throws socket.gaierror 조회에 실패한 경우 (부정 캐시 포함)
+        """
+        hostname = hostname.rstrip(".").lower()
+        try:
+            ipaddress.ip_address(hostname)
+            return [hostname]
+        except ValueError:
+            pass
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(hostname)
+            if entry is not None and entry[1] > now:
+                addresses = entry[0]
+                if isinstance(addresses, Exception):
+                    raise addresses
+                return addresses
+            future = self._inflight.get(hostname)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[hostname] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            addresses, ttl = self._lookup_shared(hostname)
+        except BaseException as exc:
+            if isinstance(exc, socket.gaierror):
+                self._store(hostname, exc, DNS_NEGATIVE_TTL)
+            future.set_exception(exc)
+            raise
+        else:
+            self._store(hostname, addresses, ttl)
+            future.set_result(addresses)
+            return addresses
+        finally:
+            with self._lock:
+                self._inflight.pop(hostname, None)
+
+    def _lookup_shared(self, hostname):
+        """Answer from the shared cache if another worker already resolved ``hostname``, else query DNS and publish."""
+        if self.shared_cache is not None:
+            data = self.shared_cache.get("dns", hostname)
+            if data == b"!":
+                raise socket.gaierror(socket.EAI_NONAME, f"{hostname} could not be resolved")
+            if data:
+                return data.decode("ascii").split(","), DNS_MIN_TTL
+        try:
+            addresses, ttl = self._lookup(hostname)
+        except socket.gaierror:
+            if self.shared_cache is not None:
+                self.shared_cache.set("dns", hostname, b"!", DNS_NEGATIVE_TTL)
+            raise
+        ttl = min(max(ttl, DNS_MIN_TTL), DNS_MAX_TTL)
+        if self.shared_cache is not None:
+            self.shared_cache.set("dns", hostname, ",".join(addresses).encode("ascii"), ttl)
+        return addresses, ttl
+
+    def _store(self, hostname, value, ttl):
+        with self._lock:
+            if len(self._entries) >= DNS_CACHE_MAX_ENTRIES:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+                if len(self._entries) >= DNS_CACHE_MAX_ENTRIES:
+                    self._entries.clear()
+            self._entries[hostname] = (value, time.monotonic() + ttl)
+
+    def _lookup(self, hostname):
+        query = self._query_upstream if self._dns is not None else self._query_system
+        v4 = _lookup_pool.submit(query, hostname, socket.AF_INET)
+        v6 = _lookup_pool.submit(query, hostname, socket.AF_INET6)
+        addresses, ttls = [], []
+        for future in (v4, v6):
+            try:
+                found, ttl = future.result(timeout=DNS_TIMEOUT)
+            except Exception:
+                continue
+            addresses.extend(a for a in found if a not in addresses)
+            if found:
+                ttls.append(ttl)
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, f"{hostname} could not be resolved")
+        return addresses, min(ttls)
+
+    def _query_system(self, hostname, family):
+        infos = socket.getaddrinfo(hostname, None, family, socket.SOCK_STREAM)
+        return [info[4][0] for info in infos], DNS_CACHE_TTL
+
+    def _query_upstream(self, hostname, family):
+        rdtype = "A" if family == socket.AF_INET else "AAAA"
+        try:
+            answer = self._dns.resolve(hostname, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.NoNameservers, dns.exception.Timeout):
+            return [], DNS_NEGATIVE_TTL
+        return [record.address for record in answer], answer.rrset.ttl
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+resolver = CachingResolver()
+
+
+def resolve(hostname):
+    return resolver.resolve(hostname)
+
+
+def create_connection(address, timeout=None, **kwargs):
+    """
+    @brief 캐시된 IP로 TCP 연결을 맺습니다. TLS의 SNI/인증서 검증은 호출 측이 원래 hostname으로 수행합니다.
+    """
+    host, port = address
+    last_error = None
+    for ip in resolve(host):
+        try:
+            return socket.create_connection((ip, port), timeout=timeout, **kwargs)
+        except OSError as exc:
+            last_error = exc
+    raise last_error
+
+
+_hook_installed = False
+
+
+def install_urllib3_hook():
+    """
+    @brief requests/urllib3가 새 연결을 만들 때 이 resolver의 캐시된 IP를 사용하도록 연결 함수를 교체합니다.
+    특징 추출 중 같은 호스트를 여러 번 조회하지 않고 처음 얻은 IP로 고정(pinning)됩니다.
+    """
+    global _hook_installed
+    if _hook_installed:
+        return
+    from urllib3.util import connection as urllib3_connection
+
+    original = urllib3_connection.create_connection
+
+    def pinned_create_connection(address, *args, **kwargs):
+        host, port = address
+        last_error = None
+        for ip in resolve(host):
+            try:
+                return original((ip, port), *args, **kwargs)
+            except OSError as exc:
+                last_error = exc
+        raise last_error
+
+    urllib3_connection.create_connection = pinned_create_connection
+    _hook_installed = True
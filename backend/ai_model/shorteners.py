@@ -0,0 +1,87 @@
+### backend/ai_model/shorteners.py
+
+import os
+import logging
+import threading
+import time
+import urllib.parse
+
+
+logger = logging.getLogger("safesurf.shorteners")
+
+SHORTENER_LIST_PATH = os.getenv(
+    "SHORTENER_LIST_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "shorteners.txt"),
+)
+SHORTENER_RELOAD_INTERVAL = float(os.getenv("SHORTENER_RELOAD_INTERVAL", "30"))
+
+
+class ShortenerIndex:
+    """
+    @class ShortenerIndex
+    @brief 단축 URL 서비스 호스트 목록을 메모리 set으로 들고 있는 클래스
+    목록 파일의 수정 시간을 주기적으로 확인하여 변경되면 다시 읽습니다(hot reload).
+    """
+    def __init__(self, path=SHORTENER_LIST_PATH, reload_interval=SHORTENER_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.hosts = frozenset()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                hosts = frozenset(
+                    line.strip().lower().rstrip(".")
+                    for line in f
+                    if line.strip() and not line.lstrip().startswith("#")
+                )
+        except OSError as e:
+            logger.warning("could not load shortener list", extra={"path": self.path, "error": str(e)})
+            return
+        self.hosts = hosts
+        self._mtime = mtime
+        logger.info("shortener list loaded", extra={"path": self.path, "count": len(hosts)})
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+
+    def is_shortener_host(self, hostname):
+        """
+        @brief hostname 또는 그 상위 도메인이 단축 서비스 목록에 있는지 검사합니다.
+        """
+        self._maybe_reload()
+        if not hostname:
+            return False
+        labels = hostname.lower().rstrip(".").split(".")
+        hosts = self.hosts
+        return any(".".join(labels[i:]) in hosts for i in range(len(labels) - 1))
+
+
+index = ShortenerIndex()
+
+
+def is_shortened(url):
+    """
+    @brief url이 단축 서비스 주소인지 검사합니다. 네트워크를 사용하지 않습니다.
+    서비스의 루트 페이지(경로 없음)는 단축 URL로 보지 않습니다.
+    """
+    parts = urllib.parse.urlsplit(url if "://" in url else f"http://{url}")
+    return index.is_shortener_host(parts.hostname) and parts.path not in ("", "/")
+
@@ -0,0 +1,72 @@
+### backend/ai_model/urls.py
+
+import ipaddress
+import urllib.parse
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# 2단계 공개 접미사 중 자주 보이는 것들입니다. (전체 Public Suffix List의 축약본)
+_MULTI_LABEL_SUFFIXES = frozenset("""
+co.kr or.kr go.kr ac.kr ne.kr re.kr pe.kr ms.kr hs.kr es.kr sc.kr kg.kr mil.kr
+co.uk org.uk ac.uk gov.uk ltd.uk plc.uk me.uk net.uk
+com.au net.au org.au edu.au gov.au
+co.jp ne.jp or.jp ac.jp go.jp
+com.cn net.cn org.cn gov.cn edu.cn
+com.tw org.tw net.tw edu.tw
+com.hk org.hk net.hk
+com.sg org.sg edu.sg
+co.in net.in org.in
+co.nz org.nz net.nz
+co.za org.za
+com.br net.br org.br
+com.mx org.mx
+com.tr org.tr net.tr
+com.vn com.ph com.my com.ar com.co com.pe co.id or.id ac.id co.th in.th
+""".split())
+
+
+def canonical_url(raw_url: str):
+    """
+    @brief
+    같은 URL의 표기 차이(대소문자, 기본 포트, fragment, 빈 경로)를 제거한 정규화 키를 만드는 함수입니다.
+    스킴이 없으면 FeatureExtractor와 동일하게 https를 가정합니다.
+    @return 정규화된 URL 문자열, 호스트를 알 수 없으면 공백 제거한 원본
+    """
+    trimmed = raw_url.strip()
+    parsed = urllib.parse.urlsplit(trimmed if "://" in trimmed else f"https://{trimmed}")
+    if not parsed.hostname:
+        return trimmed
+
+    scheme = parsed.scheme.lower()
+    host = parsed.hostname.rstrip(".")
+    try:
+        port = parsed.port
+    except ValueError:
+        return trimmed
+    netloc = host if port in (None, _DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    if parsed.username or parsed.password:
+        userinfo = parsed.username or ""
+        if parsed.password:
+            userinfo += f":{parsed.password}"
+        netloc = f"{userinfo}@{netloc}"
+    return urllib.parse.urlunsplit((scheme, netloc, parsed.path or "/", parsed.query, ""))
+
+
+def registrable_domain(hostname: str):
+    """
+    @brief
+    hostname에서 등록 가능한 도메인(eTLD+1)을 구하는 함수입니다. 예) www.naver.co.kr -> naver.co.kr
+    IP 주소는 그대로 반환합니다.
+    """
+    host = hostname.strip().lower().rstrip(".")
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    if len(labels) <= 2:
+        return host
+    if ".".join(labels[-2:]) in _MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
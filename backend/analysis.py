@@ -0,0 +1,249 @@
+### backend/analysis.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from urllib.parse import urlsplit
+
+from ai_model import allowlist
+from ai_model.extractor import FeatureExtractor, Progress, check_blacklist, features_using, parse_url
+from ai_model.urls import canonical_url
+from ai_model import breaker, inference, redirects, resolver
+import cache_backend
+import feature_archive
+from logging_config import log_stage
+from metrics import Counter, Gauge
+from prewarm import HotUrlTracker, PrewarmScheduler
+from singleflight import SingleFlight
+from whois_store import lookup as whois_lookup
+from verdict_cache import VerdictCache, FRESH, STALE
+
+VERDICT_CACHE_TTL = float(os.getenv("VERDICT_CACHE_TTL", "3600"))
+VERDICT_CACHE_STALE_TTL = float(os.getenv("VERDICT_CACHE_STALE_TTL", "86400"))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "50000"))
+# 연결 실패 등으로 분석할 수 없었던 결과는 짧게만 캐시합니다.
+UNANALYZABLE_TTL = float(os.getenv("UNANALYZABLE_CACHE_TTL", "60"))
+# 마감 시간(deadline_ms)이 있는 요청 대신 분석을 끝까지 실행할 스레드 수
+DEADLINE_WORKERS = int(os.getenv("DEADLINE_WORKERS", "32"))
+# 관측한 특징의 중요도 비중(confidence)이 이보다 낮으면 모델 판정 대신 unanalyzable로 답합니다.
+MIN_CONFIDENCE = float(os.getenv("ANALYSIS_MIN_CONFIDENCE", "0.5"))
+
+
+class DeadlinePoolFull(RuntimeError):
+    pass
+
+
+class _BoundedPool:
+    """Thread pool that refuses work once every worker is busy instead of queueing it behind them."""
+
+    def __init__(self, workers, name):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise DeadlinePoolFull("all deadline workers are busy")
+        try:
+            return self._executor.submit(self._run, fn, args, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _run(self, fn, args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+analysis_flight = SingleFlight("analysis")
+# 진행 중인 분석의 중간 상태(정규화 키 → Progress). 마감이 지난 요청은 여기까지 끝난 probe로 판정합니다.
+_progress = {}
+_deadline_pool = _BoundedPool(DEADLINE_WORKERS, "analysis")
+verdict_cache = VerdictCache(
+    VERDICT_CACHE_TTL, VERDICT_CACHE_STALE_TTL, VERDICT_CACHE_MAX_ENTRIES, backend=cache_backend.shared
+)
+resolver.resolver.shared_cache = cache_backend.shared
+redirects.cache.shared_cache = cache_backend.shared
+extractor = FeatureExtractor(
+    html_parser=inference.parse_html, whois_lookup=whois_lookup, defaults=inference.feature_defaults
+)
+hot_urls = HotUrlTracker()
+allowlist_counter = Counter("safesurf_allowlist_lookups_total", "Analyses checked against the popular-domain allowlist")
+breaker_open_gauge = Gauge("safesurf_circuit_open", "Open or half-open circuit breakers by upstream (whois, geo, host)")
+breaker_transition_counter = Counter("safesurf_circuit_transitions_total", "Circuit breaker state changes by upstream and new state")
+degraded_counter = Counter("safesurf_degraded_analyses_total", "Analyses that used neutral values for a probe skipped by an open breaker or throttling")
+deadline_shed_counter = Counter(
+    "safesurf_deadline_shed_total", "Deadline analyses that started no extraction because every deadline worker was busy"
+)
+imputed_counter = Counter("safesurf_imputed_probes_total", "Probes still running when an analysis deadline passed, by probe")
+
+
+def _on_breaker_change(name, previous, state):
+    upstream = name.partition(":")[0]
+    breaker_transition_counter.inc(upstream=upstream, state=state)
+    if previous == breaker.CLOSED:
+        breaker_open_gauge.inc(upstream=upstream)
+    elif state == breaker.CLOSED:
+        breaker_open_gauge.dec(upstream=upstream)
+
+
+breaker.breakers.listener = _on_breaker_change
+
+
+def _run_analysis(url: str, progress=None):
+    started = time.perf_counter()
+    with log_stage("extract"):
+        features, ctx = extractor.extract(url, progress=progress)
+    return _score(url, features, ctx, (time.perf_counter() - started) * 1000)
+
+
+def _score(url: str, features, ctx, extract_ms=None):
+    # extract_ms가 없으면 다른 요청이 아직 분석 중인 중간 결과이므로 아카이브에 남기지 않습니다.
+    if not features or any(f is None or f != f for f in features):
+        return {"result": "unanalyzable", "prediction": None, "probability": None, "features": features}
+
+    with log_stage("predict"):
+        prediction, prob = inference.predict(features)
+    analysis = {
+        "result": inference.RESULT_MAP.get(prediction, "unanalyzable"),
+        "prediction": prediction,
+        "probability": round(prob, 4),
+        "features": features,
+    }
+    if ctx.degraded:
+        analysis["degraded"] = sorted(ctx.degraded)
+        degraded_counter.inc()
+    if ctx.imputed:
+        analysis["imputed"] = features_using(ctx.imputed)
+        for probe in ctx.imputed:
+            imputed_counter.inc(probe=probe)
+    if ctx.degraded or ctx.imputed:
+        # 대체 값이 섞인 특징은 학습용 아카이브에 남기지 않고, 관측한 비중을 confidence로 알려 줍니다.
+        confidence = inference.confidence(features_using(ctx.degraded | ctx.imputed))
+        analysis["confidence"] = round(confidence, 4)
+        if confidence < MIN_CONFIDENCE:
+            # 대부분 기본값으로 채운 특징이면 모델이 확신하더라도 판정을 내보내지 않습니다.
+            analysis.update(result="unanalyzable", prediction=None, probability=None)
+    elif extract_ms is not None:
+        feature_archive.record(url, features, prediction, analysis["probability"], extract_ms)
+    if ctx.expanded_url:
+        analysis["expanded_url"] = ctx.expanded_url
+    return analysis
+
+
+def _store(key: str, analysis):
+    # 중립값이 섞인 결과는 캐시하지 않습니다. breaker가 열려 있는 동안은 다시 분석해도 기다리지 않고,
+    # upstream이 회복되면 바로 온전한 결과를 얻습니다.
+    if analysis.get("degraded") or analysis.get("imputed"):
+        return analysis
+    ttl = UNANALYZABLE_TTL if analysis["prediction"] is None else None
+    verdict_cache.set(key, analysis, ttl=ttl)
+    return analysis
+
+
+def _run_and_store(key: str):
+    # 캐시와 single-flight는 정규화 키로 묶이므로 특징도 키에서 계산합니다. 원본 URL로 계산하면
+    # fragment 등 키에서 지운 부분에 따라 먼저 도착한 요청이 같은 키의 판정을 정하게 됩니다.
+    progress = _progress[key] = Progress()
+    try:
+        return _store(key, _run_analysis(key, progress=progress))
+    finally:
+        _progress.pop(key, None)
+
+
+def _run_within(key: str, deadline: float):
+    # 분석은 single-flight 리더가 마감 없이 끝까지 실행해 캐시를 채우고, 이 요청은 자기 마감까지만 기다립니다.
+    # 리더를 맡을 스레드가 모두 바쁘면 대기열에 쌓지 않고, 기다릴 수 없는 요청으로 보고 바로 답합니다.
+    try:
+        future = analysis_flight.submit(key, _deadline_pool, _run_and_store, key)
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except DeadlinePoolFull:
+        deadline_shed_counter.inc()
+    except FutureTimeout:
+        pass
+    features, ctx = extractor.partial(key, _progress.get(key))
+    return _score(key, features, ctx)
+
+
+def refresh(url: str):
+    """Re-analyze ``url`` regardless of the cache and store the new result."""
+    key = canonical_url(url)
+    return analysis_flight.do(key, _run_and_store, key)
+
+
+def _allowlist_verdict(key: str):
+    parts = urlsplit(key)
+    matched = allowlist.match(parts.hostname, parts.path)
+    if matched:
+        # 로컬 블랙리스트가 허용 목록보다 우선합니다. 걸리면 전체 분석으로 넘겨 Blacklist 특징에 반영합니다.
+        ctx = parse_url(key)
+        if ctx is not None and check_blacklist(ctx) == -1:
+            allowlist_counter.inc(outcome="blacklisted")
+            return None
+    allowlist_counter.inc(outcome="hit" if matched else "miss")
+    if not matched:
+        return None
+    return {
+        "result": "legitimate",
+        "prediction": 1,
+        "probability": 1.0,
+        "features": None,
+        "allowlisted": matched,
+    }
+
+
+def score(url: str):
+    """Analyze ``url`` without the verdict cache or hot-URL tracking (bulk and offline use)."""
+    key = canonical_url(url)
+    return _allowlist_verdict(key) or _run_analysis(key)
+
+
+def analyze(url: str, deadline_ms=None):
+    """
+    Extract features for ``url`` and score them with the model.
+    Hosts on the popular-domain allowlist are answered as legitimate without
+    any network probe. Fresh cached verdicts are returned directly; stale ones
+    are returned while a background refresh runs. Concurrent misses for the
+    same canonical URL share a single extraction, and features are computed
+    from the canonical URL so every spelling of it gets the same verdict.
+    With ``deadline_ms``, a miss waits for the shared extraction only until
+    the budget runs out and is scored from the probes finished so far; the
+    features of the others are filled with the model's training defaults and
+    listed under ``imputed``, with the observed share of feature importance as
+    ``confidence``. The extraction itself keeps running and fills the cache;
+    when every deadline worker is busy none is started. Results whose
+    confidence is below ANALYSIS_MIN_CONFIDENCE are reported as
+    ``unanalyzable`` instead of the model's verdict.
+    Returns a dict with ``result``, ``prediction``, ``probability`` and ``features``.
+    """
+    deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms is not None else None
+    key = canonical_url(url)
+    allowlisted = _allowlist_verdict(key)
+    if allowlisted:
+        return allowlisted
+
+    hot_urls.record(key, url)
+    cached, state = verdict_cache.get(key)
+    if state == FRESH:
+        return cached
+    if state == STALE:
+        scheduler.submit(url, trigger="stale")
+        return cached
+    if deadline is not None:
+        return _run_within(key, deadline)
+    return analysis_flight.do(key, _run_and_store, key)
+
+
+scheduler = PrewarmScheduler(hot_urls, verdict_cache, refresh, canonical_url)
+
+
+def shutdown():
+    """Stop background refreshes and flush the feature archive."""
+    scheduler.stop()
+    _deadline_pool.shutdown(wait=False)
+    feature_archive.close()
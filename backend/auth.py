@@ -1,4 +1,5 @@
 import os
+import uuid
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -6,15 +7,18 @@ from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from fastapi import HTTPException, Depends, Request
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import User, pwd_context
-from database import SessionLocal
+from database import get_async_db
 
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
-import requests
 from urllib.parse import urlencode
-import logging
 import secrets
+from logging_config import get_logger
+import oauth_client
 
 SECRET_KEY = os.getenv("SECRET_KEY", "default-secret-key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
@@ -25,6 +29,7 @@ COOKIE_SECURE = COOKIE_SECURE_FLAG or ENV == "production"
 COOKIE_SAMESITE = "none" if COOKIE_SECURE else "lax"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
+logger = get_logger("auth")
 
 def create_access_token(data: dict, expires_delta=None):
     to_encode = data.copy()
@@ -35,28 +40,48 @@ def create_access_token(data: dict, expires_delta=None):
 def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
 
-def get_user(db, username):
-    return db.query(User).filter(User.username == username).first()
+async def get_user(db: AsyncSession, username):
+    return (await db.execute(select(User).where(User.username == username))).scalars().first()
 
-def authenticate_user(db, username, password):
-    user = get_user(db, username)
-    if not user or not verify_password(password, user.password_hash):
+async def get_user_by_id(db: AsyncSession, user_id):
+    # 토큰의 sub는 문자열이므로 UUID로 바꿔 조회합니다. 형식이 틀리면 사용자가 없는 것으로 봅니다.
+    try:
+        user_id = uuid.UUID(str(user_id))
+    except ValueError:
+        return None
+    return await db.get(User, user_id)
+
+async def release_after(db: AsyncSession, lookup):
+    """
+    Await ``lookup`` and return the connection to the pool right away. The
+    loaded user stays readable, and a long analysis in the same request
+    does not hold a connection; later queries check one out again.
+    """
+    try:
+        return await lookup
+    finally:
+        await db.close()
+
+async def authenticate_user(db: AsyncSession, username, password):
+    user = await get_user(db, username)
+    # bcrypt 검증은 수백 ms가 걸리므로 이벤트 루프를 막지 않도록 스레드에서 돌립니다.
+    if not user or not await run_in_threadpool(verify_password, password, user.password_hash):
         return None
     return user
 
-def get_current_user(request: Request, db=Depends(lambda: SessionLocal())):
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     # Try cookie first
     token = request.cookies.get("access_token")
     if token:
-        logging.debug("Token retrieved from cookie")
+        logger.debug("Token retrieved from cookie")
     else:
         # Fallback to Authorization header
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header[len("Bearer "):]
-            logging.debug("Token retrieved from Authorization header")
+            logger.debug("Token retrieved from Authorization header")
         else:
-            logging.debug("No token found in cookie or Authorization header")
+            logger.debug("No token found in cookie or Authorization header")
             raise HTTPException(status_code=401, detail="Not authenticated")
 
     try:
@@ -71,12 +96,12 @@ def get_current_user(request: Request, db=Depends(lambda: SessionLocal())):
     except JWTError:
         raise HTTPException(status_code=401, detail="Token invalid or expired")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await release_after(db, get_user_by_id(db, user_id))
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
-def get_current_user_optional(request: Request, db=Depends(lambda: SessionLocal())):
+async def get_current_user_optional(request: Request, db: AsyncSession = Depends(get_async_db)):
     auth_header = request.headers.get("Authorization")
     token = None
     if auth_header and auth_header.startswith("Bearer "):
@@ -90,12 +115,22 @@ def get_current_user_optional(request: Request, db=Depends(lambda: SessionLocal(
         user_id = payload.get("sub")
         if not user_id:
             return None
-        return db.query(User).filter(User.id == user_id).first()
     except JWTError:
         return None
+    return await release_after(db, get_user_by_id(db, user_id))
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+async def _get_or_create_user(db: AsyncSession, email, username, password_hash):
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if not user:
+        # create with required fields; placeholder password hash
+        user = User(email=email, username=username, password_hash=password_hash)
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+    return user
+
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 REDIRECT_URI = "http://localhost:8000/auth/google/callback"
@@ -125,8 +160,8 @@ def google_login():
     return RedirectResponse(url)
 
 @router.get("/google/callback")
-def google_callback(code: str, db=Depends(lambda: SessionLocal())):
-    token_endpoint = "https://oauth2.googleapis.com/token"
+async def google_callback(code: str, db: AsyncSession = Depends(get_async_db)):
+    endpoints = await oauth_client.google_endpoints()
     data = {
         "code": code,
         "client_id": GOOGLE_CLIENT_ID,
@@ -135,29 +170,28 @@ def google_callback(code: str, db=Depends(lambda: SessionLocal())):
         "grant_type": "authorization_code"
     }
 
-    token_res = requests.post(token_endpoint, data=data)
-    token_res.raise_for_status()
-    token_json = token_res.json()
+    token_json = await oauth_client.request_json("google", "POST", endpoints["token_endpoint"], data=data)
 
     google_access = token_json.get("access_token")
     if not google_access:
         raise HTTPException(status_code=400, detail="Failed to retrieve Google access token")
 
-    user_info = requests.get(
-        "https://www.googleapis.com/oauth2/v2/userinfo",
-        headers={"Authorization": f"Bearer {google_access}"}
-    ).json()
+    id_token = token_json.get("id_token")
+    if id_token:
+        # openid scope이면 ID 토큰에 이메일/이름이 들어 있어 userinfo 호출을 생략합니다.
+        user_info = await oauth_client.verify_google_id_token(id_token, GOOGLE_CLIENT_ID, google_access)
+    else:
+        user_info = await oauth_client.request_json(
+            "google", "GET", endpoints["userinfo_endpoint"],
+            headers={"Authorization": f"Bearer {google_access}"},
+        )
 
     email = user_info.get("email")
+    if not email:
+        raise HTTPException(status_code=400, detail="Google profile is missing email")
     username = user_info.get("name") or email.split("@")[0]
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        # create with required fields; placeholder password hash
-        user = User(email=email, username=username, password_hash="google-oauth")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    user = await _get_or_create_user(db, email, username, "google-oauth")
 
     # create JWT with explicit expiry
     expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -222,7 +256,7 @@ def naver_login():
 
 
 @router.get("/naver/callback")
-def naver_callback(code: str, state: str, request: Request, db=Depends(lambda: SessionLocal())):
+async def naver_callback(code: str, state: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     if not NAVER_CLIENT_ID or not NAVER_CLIENT_SECRET:
         raise HTTPException(status_code=500, detail="Naver OAuth is not configured.")
 
@@ -239,19 +273,15 @@ def naver_callback(code: str, state: str, request: Request, db=Depends(lambda: S
         "state": state,
     }
 
-    token_res = requests.post(token_endpoint, data=token_payload)
-    token_res.raise_for_status()
-    token_json = token_res.json()
+    token_json = await oauth_client.request_json("naver", "POST", token_endpoint, data=token_payload)
     access_token = token_json.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="Failed to retrieve Naver access token")
 
-    profile_res = requests.get(
-        "https://openapi.naver.com/v1/nid/me",
+    profile_json = await oauth_client.request_json(
+        "naver", "GET", "https://openapi.naver.com/v1/nid/me",
         headers={"Authorization": f"Bearer {access_token}"},
     )
-    profile_res.raise_for_status()
-    profile_json = profile_res.json()
     profile = profile_json.get("response", {})
 
     naver_id = profile.get("id")
@@ -264,12 +294,7 @@ def naver_callback(code: str, state: str, request: Request, db=Depends(lambda: S
         email = f"{naver_id}@naver.com"
     username = nickname or email.split("@")[0]
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        user = User(email=email, username=username, password_hash="naver-oauth")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    user = await _get_or_create_user(db, email, username, "naver-oauth")
 
     expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     jwt_token = create_access_token({"sub": str(user.id)}, expires_delta=expires)
@@ -342,7 +367,7 @@ def kakao_login():
 
 
 @router.get("/kakao/callback")
-def kakao_callback(code: str, state: str, request: Request, db=Depends(lambda: SessionLocal())):
+async def kakao_callback(code: str, state: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     if not KAKAO_CLIENT_ID:
         raise HTTPException(status_code=500, detail="Kakao OAuth is not configured.")
 
@@ -360,19 +385,15 @@ def kakao_callback(code: str, state: str, request: Request, db=Depends(lambda: S
     if KAKAO_CLIENT_SECRET:
         token_payload["client_secret"] = KAKAO_CLIENT_SECRET
 
-    token_res = requests.post(token_endpoint, data=token_payload)
-    token_res.raise_for_status()
-    token_json = token_res.json()
+    token_json = await oauth_client.request_json("kakao", "POST", token_endpoint, data=token_payload)
     access_token = token_json.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="Failed to retrieve Kakao access token")
 
-    profile_res = requests.get(
-        "https://kapi.kakao.com/v2/user/me",
+    profile_json = await oauth_client.request_json(
+        "kakao", "GET", "https://kapi.kakao.com/v2/user/me",
         headers={"Authorization": f"Bearer {access_token}"},
     )
-    profile_res.raise_for_status()
-    profile_json = profile_res.json()
 
     kakao_id = profile_json.get("id")
     account = profile_json.get("kakao_account", {}) or {}
@@ -386,12 +407,7 @@ def kakao_callback(code: str, state: str, request: Request, db=Depends(lambda: S
         email = f"{kakao_id}@kakao.com"
     username = nickname or email.split("@")[0]
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        user = User(email=email, username=username, password_hash="kakao-oauth")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    user = await _get_or_create_user(db, email, username, "kakao-oauth")
 
     expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     jwt_token = create_access_token({"sub": str(user.id)}, expires_delta=expires)
@@ -441,10 +457,10 @@ from fastapi import Response
 from fastapi.responses import JSONResponse
 
 @router.post("/token")
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db=Depends(lambda: SessionLocal())
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
@@ -0,0 +1,242 @@
+### backend/bulk_score.py
+
+import argparse
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_model import inference, resolver
+from logging_config import setup_logging, get_logger
+
+logger = get_logger("bulk_score")
+
+OUTPUT_COLUMNS = ["url", "result", "prediction", "probability", *inference.FEATURE_NAMES]
+
+
+def _open_input(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
+    return open(path, encoding="utf-8", errors="replace", newline="")
+
+
+def iter_urls(f, fmt, url_column):
+    """Yield URLs one at a time from a newline-delimited or CSV stream."""
+    if fmt == "lines":
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith("#"):
+                yield url
+        return
+
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    if url_column in header:
+        index = header.index(url_column)
+    else:
+        # 헤더가 없으면 첫 번째 행도 데이터로 취급합니다.
+        index = 0
+        if header and header[0].strip():
+            yield header[0].strip()
+    for row in reader:
+        if len(row) > index and row[index].strip():
+            yield row[index].strip()
+
+
+def _detect_format(path, fmt):
+    if fmt != "auto":
+        return fmt
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "lines"
+
+
+def _top_features(attributions, limit=3):
+    return ";".join(f"{name}={value}:{contribution:+.3f}" for name, value, contribution in attributions[:limit])
+
+
+def add_explanations(rows):
+    """Append the top attributions to every scored row with one batched explainer call."""
+    feature_count = len(inference.FEATURE_NAMES)
+    scored = [row for row in rows if row[2] is not None and row[4] is not None]
+    explained = inference.explain_batch([row[4:4 + feature_count] for row in scored]) if scored else None
+    tops = {id(row): _top_features(attributions) for row, attributions in zip(scored, explained or [])}
+    for row in rows:
+        row.append(tops.get(id(row), ""))
+
+
+def _row(url, analysis):
+    features = analysis.get("features") or [None] * len(inference.FEATURE_NAMES)
+    return [url, analysis["result"], analysis["prediction"], analysis["probability"], *features]
+
+
+class Checkpoint:
+    """
+    Progress marker stored next to the output as JSON, written atomically.
+    ``processed`` counts input URLs whose results are durably written and
+    ``output_bytes`` is the CSV size at that point, so a resumed run can
+    drop any partially written tail.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.processed = 0
+        self.output_bytes = 0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.processed = state["processed"]
+        self.output_bytes = state.get("output_bytes", 0)
+        return True
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"processed": self.processed, "output_bytes": self.output_bytes}, f)
+        os.replace(tmp_path, self.path)
+
+
+class CsvSink:
+    def __init__(self, path, resume_bytes, columns):
+        exists = resume_bytes > 0 and os.path.exists(path)
+        if exists:
+            # 체크포인트 이후에 기록된 불완전한 꼬리를 잘라냅니다.
+            os.truncate(path, resume_bytes)
+        self._file = open(path, "a" if exists else "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if not exists:
+            self._writer.writerow(columns)
+
+    def write(self, rows, start_index):
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return os.fstat(self._file.fileno()).st_size
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes each batch as its own part file named by its first input index, so retries overwrite cleanly."""
+
+    def __init__(self, path, resume_bytes, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self.columns = columns
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, rows, start_index):
+        columns = list(zip(*rows))
+        table = self._pa.table({name: list(values) for name, values in zip(self.columns, columns)})
+        part_path = os.path.join(self.path, f"part-{start_index:012d}.parquet")
+        self._pq.write_table(table, f"{part_path}.tmp")
+        os.replace(f"{part_path}.tmp", part_path)
+        return 0
+
+    def close(self):
+        pass
+
+
+def run(args):
+    import analysis
+    import feature_archive
+
+    resolver.install_urllib3_hook()
+    inference.start_pool()
+
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output}.ckpt")
+    if args.resume and checkpoint.load():
+        logger.info("resuming", extra={"processed": checkpoint.processed})
+    elif os.path.exists(checkpoint.path):
+        os.remove(checkpoint.path)
+
+    columns = OUTPUT_COLUMNS + (["top_features"] if args.explain else [])
+    sink_cls = ParquetSink if args.output_format == "parquet" else CsvSink
+    sink = sink_cls(args.output, checkpoint.output_bytes, columns)
+    fmt = _detect_format(args.input, args.input_format)
+
+    def score(url):
+        try:
+            return url, analysis.score(url)
+        except Exception as e:
+            logger.info("scoring failed", extra={"url": url, "error": str(e)})
+            return url, {"result": "error", "prediction": None, "probability": None, "features": None}
+
+    started = time.monotonic()
+    batch = []
+    batch_start = checkpoint.processed
+    window = deque()
+    max_window = args.concurrency * 2
+
+    def drain(limit):
+        while len(window) > limit:
+            batch.append(_row(*window.popleft().result()))
+            if len(batch) >= args.batch_size:
+                flush()
+
+    def flush():
+        nonlocal batch, batch_start
+        if not batch:
+            return
+        if args.explain:
+            add_explanations(batch)
+        checkpoint.output_bytes = sink.write(batch, batch_start)
+        checkpoint.processed = batch_start + len(batch)
+        checkpoint.save()
+        elapsed = time.monotonic() - started
+        logger.info("progress", extra={"processed": checkpoint.processed, "elapsed_s": round(elapsed, 1)})
+        batch_start = checkpoint.processed
+        batch = []
+
+    with _open_input(args.input) as f, ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        urls = itertools.islice(iter_urls(f, fmt, args.url_column), checkpoint.processed, None)
+        for url in urls:
+            window.append(executor.submit(score, url))
+            drain(max_window)
+        drain(0)
+        flush()
+
+    sink.close()
+    inference.shutdown_pool()
+    feature_archive.close()
+    print(f"✅ {checkpoint.processed} URLs scored -> {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a list of URLs offline and stream verdicts to CSV or Parquet.")
+    parser.add_argument("input", help="URL list: newline-delimited or CSV, optionally .gz ('-' for stdin)")
+    parser.add_argument("-o", "--output", required=True, help="output CSV file, or directory for Parquet parts")
+    parser.add_argument("--input-format", choices=["auto", "lines", "csv"], default="auto")
+    parser.add_argument("--url-column", default="url", help="CSV column holding the URL (default: url, else first column)")
+    parser.add_argument("--output-format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--concurrency", type=int, default=16, help="URLs analyzed at the same time")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per write and checkpoint")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.ckpt)")
+    parser.add_argument("--explain", action="store_true", help="add the top feature attributions per URL")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint instead of starting over")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
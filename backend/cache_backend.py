@@ -0,0 +1,177 @@
+### backend/cache_backend.py
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from logging_config import get_logger
+from metrics import Counter
+
+logger = get_logger("cache_backend")
+
+# "local"(프로세스 내 LRU), "sqlite:///경로"(같은 호스트의 워커끼리 공유), "redis://host:port/db"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_PURGE_EVERY = 1000
+
+ops_counter = Counter("safesurf_cache_backend_ops_total", "Cache backend operations by namespace and outcome")
+
+
+class CacheBackend:
+    """
+    Byte-oriented key/value store with per-entry TTL, split into namespaces
+    ("verdict", "dns", "whois", ...). Callers serialize their own values.
+    A failing shared store behaves like a miss instead of failing the request.
+    """
+
+    name = "base"
+
+    def get(self, namespace, key):
+        try:
+            value = self._get(namespace, key)
+        except Exception as e:
+            ops_counter.inc(namespace=namespace, outcome="error")
+            logger.info("cache get failed", extra={"backend": self.name, "error": str(e)})
+            return None
+        ops_counter.inc(namespace=namespace, outcome="miss" if value is None else "hit")
+        return value
+
+    def set(self, namespace, key, value, ttl):
+        try:
+            self._set(namespace, key, value, ttl)
+        except Exception as e:
+            ops_counter.inc(namespace=namespace, outcome="error")
+            logger.info("cache set failed", extra={"backend": self.name, "error": str(e)})
+
+    def _get(self, namespace, key):
+        raise NotImplementedError
+
+    def _set(self, namespace, key, value, ttl):
+        raise NotImplementedError
+
+
+class LocalLRUBackend(CacheBackend):
+    """In-process LRU. Each worker process has its own copy."""
+
+    name = "local"
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[(namespace, key)]
+                return None
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def _set(self, namespace, key, value, ttl):
+        with self._lock:
+            self._entries[(namespace, key)] = (value, time.time() + ttl)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache file shared by every worker on one host. WAL mode lets readers run
+    while another process writes; expired rows are purged every few thousand writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, namespace, key):
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, namespace, key, value, ttl):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, value, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % CACHE_PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache on a Redis-protocol server; expiry is delegated to the server."""
+
+    name = "redis"
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.5)
+
+    @staticmethod
+    def _key(namespace, key):
+        return f"safesurf:{namespace}:{key}"
+
+    def _get(self, namespace, key):
+        return self._client.get(self._key(namespace, key))
+
+    def _set(self, namespace, key, value, ttl):
+        self._client.set(self._key(namespace, key), value, px=max(int(ttl * 1000), 1))
+
+
+def create_shared_backend(spec=CACHE_BACKEND):
+    """
+    Build the cross-worker backend named by CACHE_BACKEND. Returns None for
+    "local" or when the shared store cannot be used, in which case callers
+    keep their in-process caches.
+    """
+    if spec == "local":
+        return None
+    try:
+        if spec.startswith("sqlite:///"):
+            return SQLiteBackend(spec[len("sqlite:///"):])
+        if spec.startswith(("redis://", "rediss://", "unix://")):
+            return RedisBackend(spec)
+    except ImportError:
+        logger.warning("CACHE_BACKEND needs the redis package; using local caches", extra={"backend": spec})
+        return None
+    except Exception as e:
+        logger.warning("could not open CACHE_BACKEND; using local caches", extra={"backend": spec, "error": str(e)})
+        return None
+    logger.warning("unknown CACHE_BACKEND; using local caches", extra={"backend": spec})
+    return None
+
+
+shared = create_shared_backend()
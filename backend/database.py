@@ -1,19 +1,54 @@
 ### backend/database.py
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+# API 요청은 비동기 드라이버로 처리합니다. 지정하지 않으면 DATABASE_URL에서 드라이버만 바꿔 씁니다.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+# 비동기 엔진의 연결 풀 크기(SQLite에는 적용하지 않음)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# 워커·파티션 관리·prewarm처럼 스레드에서 도는 작업과 CLI는 동기 엔진을 그대로 씁니다.
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_url(url):
+    """Swap a sync driver (psycopg2, pysqlite) for its async counterpart: asyncpg or aiosqlite."""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}") if driver else url
+
+
+def _async_engine_options(url):
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": True}
+
+
+_async_url = make_url(ASYNC_DATABASE_URL) if ASYNC_DATABASE_URL else async_url(DATABASE_URL)
+async_engine = create_async_engine(_async_url, **_async_engine_options(_async_url))
+# commit 뒤에 속성을 다시 읽으려고 DB에 가지 않도록 만료시키지 않습니다.
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
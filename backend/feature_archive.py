@@ -0,0 +1,176 @@
+### backend/feature_archive.py
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow가 없으면 아카이브를 끄고 분석은 그대로 진행합니다.
+    pa = None
+
+from ai_model.inference import FEATURE_NAMES, MODEL_PATH
+from logging_config import get_logger
+from metrics import Counter
+
+logger = get_logger("feature_archive")
+
+FEATURE_ARCHIVE_ENABLED = os.getenv("FEATURE_ARCHIVE_ENABLED", "True").lower() == "true"
+FEATURE_ARCHIVE_DIR = os.getenv("FEATURE_ARCHIVE_DIR", "assets/feature_archive")
+FEATURE_ARCHIVE_FLUSH_ROWS = int(os.getenv("FEATURE_ARCHIVE_FLUSH_ROWS", "5000"))
+FEATURE_ARCHIVE_FLUSH_INTERVAL = float(os.getenv("FEATURE_ARCHIVE_FLUSH_INTERVAL", "60"))
+FEATURE_ARCHIVE_QUEUE_SIZE = int(os.getenv("FEATURE_ARCHIVE_QUEUE_SIZE", "50000"))
+
+rows_counter = Counter("safesurf_feature_archive_rows_total", "Feature vectors handed to the archive by outcome")
+
+_STOP = object()
+# *_Count 특징은 개수 그대로라 int8을 넘을 수 있습니다. int16으로 저장하고 범위를 넘는 값은 잘라 둡니다.
+# (모델의 개수 특징 분기 기준은 한 자리 수라서 잘라도 예측은 바뀌지 않습니다.)
+FEATURE_MIN, FEATURE_MAX = -(2 ** 15), 2 ** 15 - 1
+
+
+def clamp_feature(value):
+    return value if value is None else max(FEATURE_MIN, min(FEATURE_MAX, int(value)))
+
+
+def schema():
+    fields = [
+        pa.field("url", pa.string()),
+        pa.field("host", pa.string()),
+        *(pa.field(name, pa.int16()) for name in FEATURE_NAMES),
+        pa.field("prediction", pa.int8()),
+        pa.field("probability", pa.float32()),
+        pa.field("model", pa.string()),
+        pa.field("extracted_at", pa.timestamp("ms", tz="UTC")),
+        pa.field("extract_ms", pa.float32()),
+    ]
+    return pa.schema(fields)
+
+
+class FeatureArchive:
+    """
+    Append-only Parquet archive of scored feature vectors, partitioned by day
+    (``date=YYYY-MM-DD/part-*.parquet``). ``record()`` only enqueues; a
+    background thread batches rows and writes a new part file every
+    ``flush_rows`` rows or ``flush_interval`` seconds. When the queue is full
+    rows are dropped rather than slowing down analysis.
+    """
+
+    def __init__(self, directory, flush_rows=FEATURE_ARCHIVE_FLUSH_ROWS,
+                 flush_interval=FEATURE_ARCHIVE_FLUSH_INTERVAL, queue_size=FEATURE_ARCHIVE_QUEUE_SIZE):
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.model = os.path.basename(MODEL_PATH)
+        self._schema = schema()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._seq = 0
+        self._thread = threading.Thread(target=self._run, name="feature-archive", daemon=True)
+        self._thread.start()
+
+    def record(self, url, features, prediction, probability, extracted_at, extract_ms):
+        row = {
+            "url": url,
+            "host": urlsplit(url).hostname,
+            **dict(zip(FEATURE_NAMES, map(clamp_feature, features))),
+            "prediction": prediction,
+            "probability": probability,
+            "model": self.model,
+            "extracted_at": extracted_at,
+            "extract_ms": extract_ms,
+        }
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            rows_counter.inc(outcome="dropped")
+
+    def _run(self):
+        buffer = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(buffer)
+                return
+            if item is not None:
+                buffer.append(item)
+            if len(buffer) >= self.flush_rows or time.monotonic() >= deadline:
+                self._flush(buffer)
+                buffer = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, rows):
+        if not rows:
+            return
+        partitions = {}
+        for row in rows:
+            partitions.setdefault(row["extracted_at"].strftime("%Y-%m-%d"), []).append(row)
+        for day, day_rows in partitions.items():
+            try:
+                written = self._write_part(day, day_rows)
+            except Exception as e:
+                rows_counter.inc(len(day_rows), outcome="failed")
+                logger.warning("feature archive write failed", extra={"rows": len(day_rows), "error": str(e)})
+            else:
+                rows_counter.inc(written, outcome="written")
+
+    def _write_part(self, day, rows):
+        partition = os.path.join(self.directory, f"date={day}")
+        os.makedirs(partition, exist_ok=True)
+        self._seq += 1
+        name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._seq:06d}.parquet"
+        table = self._to_table(rows)
+        if table.num_rows == 0:
+            return 0
+        # 점으로 시작하는 임시 파일은 Parquet 리더가 무시하므로 쓰는 도중의 파일이 읽히지 않습니다.
+        tmp_path = os.path.join(partition, f".{name}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, os.path.join(partition, name))
+        return table.num_rows
+
+    def _to_table(self, rows):
+        """Convert rows to a table; if the batch fails, drop only the rows that cannot be converted."""
+        try:
+            return pa.Table.from_pylist(rows, schema=self._schema)
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
+        valid = []
+        for row in rows:
+            try:
+                pa.Table.from_pylist([row], schema=self._schema)
+            except (pa.ArrowException, TypeError, ValueError) as e:
+                rows_counter.inc(outcome="rejected")
+                logger.warning("feature archive row rejected", extra={"url": row.get("url"), "error": str(e)})
+            else:
+                valid.append(row)
+        return pa.Table.from_pylist(valid, schema=self._schema)
+
+    def close(self, timeout=10):
+        """Flush buffered rows and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+archive = None
+if FEATURE_ARCHIVE_ENABLED:
+    if pa is None:
+        logger.warning("FEATURE_ARCHIVE_ENABLED is set but pyarrow is not installed; feature archive disabled")
+    else:
+        archive = FeatureArchive(FEATURE_ARCHIVE_DIR)
+
+
+def record(url, features, prediction, probability, extract_ms):
+    if archive is not None:
+        archive.record(url, features, prediction, probability, datetime.now(timezone.utc), extract_ms)
+
+
+def close():
+    if archive is not None:
+        archive.close()
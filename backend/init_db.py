@@ -1,10 +1,31 @@
+import os
+import time
+
+from sqlalchemy.exc import OperationalError
+
 from database import engine
 from models import Base
+from partitions import ensure_partitions
+
+# docker-compose에서는 DB 컨테이너가 준비되기 전에 실행될 수 있으므로 잠시 재시도합니다.
+INIT_DB_RETRIES = int(os.getenv("INIT_DB_RETRIES", "30"))
+INIT_DB_RETRY_INTERVAL = float(os.getenv("INIT_DB_RETRY_INTERVAL", "1"))
 
-def init():
+def init(retries=INIT_DB_RETRIES, interval=INIT_DB_RETRY_INTERVAL):
     print("📦 DB 테이블 생성 중...")
-    Base.metadata.create_all(bind=engine)
+    for attempt in range(1, retries + 1):
+        try:
+            Base.metadata.create_all(bind=engine)
+            # Postgres라면 search_logs의 이번 달과 다음 몇 달 파티션을 만듭니다.
+            with engine.begin() as conn:
+                ensure_partitions(conn)
+            break
+        except OperationalError:
+            if attempt == retries:
+                raise
+            print(f"⏳ DB 연결 대기 중... ({attempt}/{retries})")
+            time.sleep(interval)
     print("✅ 완료!")
 
 if __name__ == "__main__":
-    init()
\ No newline at end of file
+    init()
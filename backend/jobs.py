@@ -0,0 +1,482 @@
+### backend/jobs.py
+
+import hashlib
+import hmac
+import ipaddress
+import itertools
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import and_, func, or_, select, update
+
+import models
+from ai_model import resolver
+from database import SessionLocal
+from logging_config import get_logger
+from metrics import Counter, Gauge
+
+logger = get_logger("jobs")
+
+# 검색 기록(searched_at)은 한국 표준시로 남깁니다. SQLite는 시간대 없이 이 시각 그대로 돌려줍니다.
+KST = timezone(timedelta(hours=9))
+
+# local: API 프로세스 안의 스레드 풀에서 실행합니다.
+# postgres: analysis_tasks 테이블에 넣고 별도 worker.py 프로세스들이 가져가 실행합니다.
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "local").lower()
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "8"))
+JOBS_MAX_QUEUED = int(os.getenv("JOBS_MAX_QUEUED", "1000"))
+# 끝난 작업의 결과를 조회할 수 있도록 남겨 두는 시간(초)입니다.
+JOBS_RESULT_TTL = float(os.getenv("JOBS_RESULT_TTL", "3600"))
+JOBS_WEBHOOK_TIMEOUT = float(os.getenv("JOBS_WEBHOOK_TIMEOUT", "5"))
+JOBS_WEBHOOK_RETRIES = int(os.getenv("JOBS_WEBHOOK_RETRIES", "3"))
+# 설정하면 웹훅 본문의 HMAC-SHA256 서명을 X-SafeSurf-Signature 헤더로 보냅니다.
+JOBS_WEBHOOK_SECRET = os.getenv("JOBS_WEBHOOK_SECRET", "")
+# 웹훅이 내부망(사설/루프백 주소)을 호출하지 못하도록 기본으로 막습니다.
+JOBS_WEBHOOK_ALLOW_PRIVATE = os.getenv("JOBS_WEBHOOK_ALLOW_PRIVATE", "False").lower() == "true"
+# 워커가 작업을 잡고 있는 시간(초). 이 안에 갱신하지 못하면 다른 워커가 다시 가져갑니다.
+JOBS_LEASE_SECONDS = float(os.getenv("JOBS_LEASE_SECONDS", "60"))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+
+# 숫자가 작을수록 먼저 처리합니다. 확장 프로그램의 실시간 검사가 대량 제출보다 앞섭니다.
+PRIORITIES = {"interactive": 0, "normal": 1, "bulk": 2}
+PRIORITY_NAMES = {rank: name for name, rank in PRIORITIES.items()}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+queued_gauge = Gauge("safesurf_jobs_queued", "Analysis jobs waiting for a worker by priority")
+jobs_counter = Counter("safesurf_jobs_total", "Analysis jobs by final status")
+webhook_counter = Counter("safesurf_jobs_webhooks_total", "Job webhook deliveries by outcome")
+
+
+class QueueFull(Exception):
+    pass
+
+
+class InvalidCallback(ValueError):
+    pass
+
+
+class Job:
+    __slots__ = (
+        "id", "url", "priority", "status", "result", "error", "user_id",
+        "callback_url", "created_at", "started_at", "finished_at",
+    )
+
+    def __init__(self, url, priority, user_id=None, callback_url=None):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.priority = priority
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.user_id = user_id
+        self.callback_url = callback_url
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+
+    @classmethod
+    def from_task(cls, task):
+        """Build a Job view of an ``analysis_tasks`` row."""
+        job = cls.__new__(cls)
+        job.id = task.id.hex
+        job.url = task.url
+        job.priority = PRIORITY_NAMES.get(task.priority, "normal")
+        job.status = task.status
+        job.result = task.result
+        job.error = task.error
+        job.user_id = task.user_id
+        job.callback_url = task.callback_url
+        job.created_at = task.created_at
+        job.started_at = task.started_at
+        job.finished_at = task.finished_at
+        return job
+
+    def to_dict(self):
+        payload = {
+            "job_id": self.id,
+            "url": self.url,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if self.status == DONE:
+            payload["result"] = self.result
+        if self.status == FAILED:
+            payload["error"] = self.error
+        return payload
+
+
+def _callback_addresses(hostname):
+    """
+    Resolve a callback host and return its addresses, raising InvalidCallback
+    if any of them is private. Raises socket.gaierror if it does not resolve.
+    """
+    addresses = resolver.resolve(hostname)
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved or ip.is_multicast:
+            raise InvalidCallback("callback_url must not point to a private address")
+    return addresses
+
+
+def validate_callback(url):
+    """Reject callback URLs that are not http(s) or that point into private networks."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise InvalidCallback("callback_url must be an http(s) URL")
+    if JOBS_WEBHOOK_ALLOW_PRIVATE:
+        return
+    try:
+        _callback_addresses(parts.hostname)
+    except socket.gaierror:
+        raise InvalidCallback("callback_url host does not resolve")
+
+
+def search_log(user_id, url, result):
+    """A SearchLog row for one finished analysis, ready to add to a sync or async session."""
+    return models.SearchLog(
+        user_id=user_id,
+        query_url=url,
+        result=result,
+        # 예전에는 "... KST" 문자열을 넘겼습니다. 같은 시각의 datetime이면 SQLite(aiosqlite)에서도 저장됩니다.
+        searched_at=datetime.now(KST).replace(microsecond=0),
+    )
+
+
+def record_search(db, user_id, url, result):
+    db.add(search_log(user_id, url, result))
+    db.commit()
+
+
+def record_job_search(job):
+    """Add a finished job to its owner's search history, as /api/analyze does."""
+    if job.user_id is None or job.result["result"] == "unanalyzable":
+        return
+    session = SessionLocal()
+    try:
+        record_search(session, job.user_id, job.url, job.result["result"])
+    finally:
+        session.close()
+
+
+def _run_analysis(url):
+    from analysis import analyze
+
+    return analyze(url)
+
+
+class JobQueue:
+    """
+    Bounded in-process priority queue of analysis jobs drained by a fixed
+    pool of worker threads. Finished jobs stay readable for JOBS_RESULT_TTL
+    seconds and can notify a webhook. Workers start on the first submission.
+    """
+
+    def __init__(self, workers=JOBS_WORKERS, max_queued=JOBS_MAX_QUEUED, result_ttl=JOBS_RESULT_TTL,
+                 run=_run_analysis, on_complete=record_job_search):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.run = run
+        self.on_complete = on_complete
+        self._queue = queue.PriorityQueue()
+        self._jobs = {}
+        self._queued = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._webhooks = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-webhook")
+
+    def _ensure_workers(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, url, priority="normal", user_id=None, callback_url=None):
+        job = Job(url, priority, user_id=user_id, callback_url=callback_url)
+        with self._lock:
+            if self._queued >= self.max_queued:
+                raise QueueFull()
+            self._prune()
+            self._jobs[job.id] = job
+            self._queued += 1
+            self._ensure_workers()
+        queued_gauge.inc(priority=priority)
+        self._queue.put((PRIORITIES[priority], next(self._seq), job))
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._queued -= 1
+            queued_gauge.dec(priority=job.priority)
+            job.status = RUNNING
+            job.started_at = datetime.now(timezone.utc)
+            try:
+                job.result = self.run(job.url)
+                job.status = DONE
+            except Exception as e:
+                logger.warning("analysis job failed", extra={"job_id": job.id, "url": job.url, "error": str(e)})
+                job.error = str(e)
+                job.status = FAILED
+            job.finished_at = datetime.now(timezone.utc)
+            jobs_counter.inc(status=job.status)
+            if self.on_complete is not None and job.status == DONE:
+                try:
+                    self.on_complete(job)
+                except Exception:
+                    logger.exception("job completion hook failed", extra={"job_id": job.id})
+            if job.callback_url:
+                self._webhooks.submit(deliver_webhook, job.callback_url, job.to_dict())
+
+    def stop(self):
+        for _ in self._threads:
+            # 우선순위가 가장 낮은 종료 신호를 넣어 남은 작업을 먼저 처리하게 합니다.
+            self._queue.put((len(PRIORITIES), next(self._seq), None))
+        self._webhooks.shutdown(wait=False)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class DatabaseJobQueue:
+    """
+    Work queue stored in the ``analysis_tasks`` table. The API tier only
+    inserts and reads rows; ``worker.py`` processes on any number of nodes
+    claim them with ``FOR UPDATE SKIP LOCKED`` so no two workers take the
+    same task. A claimed task carries a lease that its worker keeps renewing;
+    if the worker dies the lease lapses and another worker retries the task,
+    up to JOBS_MAX_ATTEMPTS times.
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_queued=JOBS_MAX_QUEUED,
+                 lease_seconds=JOBS_LEASE_SECONDS, max_attempts=JOBS_MAX_ATTEMPTS):
+        self.session_factory = session_factory
+        self.max_queued = max_queued
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+
+    def submit(self, url, priority="normal", user_id=None, callback_url=None):
+        with self.session_factory() as session:
+            queued = session.scalar(
+                select(func.count()).select_from(models.AnalysisTask).where(models.AnalysisTask.status == QUEUED)
+            )
+            if queued >= self.max_queued:
+                raise QueueFull()
+            task = models.AnalysisTask(
+                url=url,
+                priority=PRIORITIES[priority],
+                status=QUEUED,
+                user_id=user_id,
+                callback_url=callback_url,
+                attempts=0,
+                created_at=_utcnow(),
+            )
+            session.add(task)
+            session.commit()
+            return Job.from_task(task)
+
+    def get(self, job_id):
+        try:
+            task_id = uuid.UUID(job_id)
+        except ValueError:
+            return None
+        with self.session_factory() as session:
+            task = session.get(models.AnalysisTask, task_id)
+            return Job.from_task(task) if task is not None else None
+
+    def stop(self):
+        pass
+
+    # 아래는 worker.py에서 사용합니다.
+
+    def claim(self, worker_id, limit):
+        """Lease up to ``limit`` runnable tasks (queued, or abandoned by a dead worker) to ``worker_id``."""
+        Task = models.AnalysisTask
+        now = _utcnow()
+        with self.session_factory() as session:
+            candidates = (
+                select(Task.id)
+                .where(
+                    or_(
+                        Task.status == QUEUED,
+                        and_(Task.status == RUNNING, Task.lease_expires_at < now, Task.attempts < self.max_attempts),
+                    )
+                )
+                .order_by(Task.priority, Task.created_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            ids = session.scalars(candidates).all()
+            if not ids:
+                session.rollback()
+                return []
+            session.execute(
+                update(Task)
+                .where(Task.id.in_(ids))
+                .values(
+                    status=RUNNING,
+                    worker_id=worker_id,
+                    attempts=Task.attempts + 1,
+                    lease_expires_at=now + self.lease,
+                    started_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            tasks = session.scalars(select(Task).where(Task.id.in_(ids))).all()
+            return [Job.from_task(task) for task in tasks]
+
+    def renew(self, worker_id, job_ids):
+        """Extend the lease on tasks this worker is still running."""
+        if not job_ids:
+            return
+        Task = models.AnalysisTask
+        with self.session_factory() as session:
+            session.execute(
+                update(Task)
+                .where(Task.id.in_([uuid.UUID(job_id) for job_id in job_ids]), Task.worker_id == worker_id, Task.status == RUNNING)
+                .values(lease_expires_at=_utcnow() + self.lease)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+    def finish(self, worker_id, job, result=None, error=None):
+        """
+        Store the outcome of a leased task. A failure with attempts left puts
+        the task back in the queue. Returns the finished Job, or None if the
+        task was requeued or the lease had already passed to another worker.
+        """
+        Task = models.AnalysisTask
+        now = _utcnow()
+        with self.session_factory() as session:
+            task = session.scalars(
+                select(Task).where(Task.id == uuid.UUID(job.id)).with_for_update()
+            ).first()
+            if task is None or task.worker_id != worker_id or task.status != RUNNING:
+                session.rollback()
+                return None
+            if error is not None and task.attempts < self.max_attempts:
+                task.status, task.error, task.worker_id, task.lease_expires_at = QUEUED, error, None, None
+                session.commit()
+                return None
+            task.status = DONE if error is None else FAILED
+            task.result, task.error = result, error
+            task.finished_at, task.lease_expires_at = now, None
+            if task.status == DONE and task.user_id is not None and result["result"] != "unanalyzable":
+                # 결과와 검색 기록을 한 트랜잭션으로 남깁니다.
+                record_search(session, task.user_id, task.url, result["result"])
+            else:
+                session.commit()
+            return Job.from_task(task)
+
+    def reap(self):
+        """Fail tasks whose lease expired after their last allowed attempt."""
+        Task = models.AnalysisTask
+        now = _utcnow()
+        with self.session_factory() as session:
+            tasks = session.scalars(
+                select(Task)
+                .where(Task.status == RUNNING, Task.lease_expires_at < now, Task.attempts >= self.max_attempts)
+                .with_for_update(skip_locked=True)
+            ).all()
+            for task in tasks:
+                task.status, task.error = FAILED, f"worker lease expired after {task.attempts} attempts"
+                task.finished_at, task.lease_expires_at = now, None
+            session.commit()
+            return [Job.from_task(task) for task in tasks]
+
+
+def create_job_queue():
+    if JOBS_BACKEND == "postgres":
+        return DatabaseJobQueue()
+    if JOBS_BACKEND != "local":
+        raise ValueError(f"Unknown JOBS_BACKEND: {JOBS_BACKEND}")
+    return JobQueue()
+
+
+def _post_webhook(url, body, headers):
+    """
+    POST to ``url``. Unless private callbacks are allowed, the host is checked
+    again and the connection goes to the checked address, with the original
+    Host header and TLS server name, so DNS cannot change between the check
+    and the request.
+    """
+    if JOBS_WEBHOOK_ALLOW_PRIVATE:
+        return httpx.post(url, content=body, headers=headers, timeout=JOBS_WEBHOOK_TIMEOUT, follow_redirects=False)
+    target = httpx.URL(url)
+    headers = {**headers, "Host": target.netloc.decode("ascii")}
+    last_error = None
+    # 환경 변수의 프록시를 거치면 고정한 주소가 의미 없으므로 쓰지 않습니다.
+    with httpx.Client(timeout=JOBS_WEBHOOK_TIMEOUT, follow_redirects=False, trust_env=False) as client:
+        for address in _callback_addresses(target.host):
+            request = client.build_request(
+                "POST", target.copy_with(host=address), content=body, headers=headers,
+                extensions={"sni_hostname": target.host},
+            )
+            try:
+                return client.send(request)
+            except httpx.ConnectError as e:
+                last_error = e
+    raise last_error
+
+
+def deliver_webhook(url, payload):
+    """
+    POST the finished job to its callback URL, retrying with backoff on errors
+    and 5xx. A callback that now resolves to a private address is dropped.
+    """
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if JOBS_WEBHOOK_SECRET:
+        signature = hmac.new(JOBS_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        headers["X-SafeSurf-Signature"] = f"sha256={signature}"
+    for attempt in range(1, JOBS_WEBHOOK_RETRIES + 1):
+        try:
+            response = _post_webhook(url, body, headers)
+            if response.status_code < 500:
+                webhook_counter.inc(outcome="delivered" if response.is_success else "rejected")
+                return
+        except InvalidCallback as e:
+            webhook_counter.inc(outcome="rejected")
+            logger.warning("job webhook blocked", extra={"url": url, "job_id": payload.get("job_id"), "error": str(e)})
+            return
+        except (httpx.HTTPError, socket.gaierror) as e:
+            logger.info("job webhook failed", extra={"url": url, "attempt": attempt, "error": str(e)})
+        time.sleep(2 ** (attempt - 1))
+    webhook_counter.inc(outcome="failed")
+    logger.warning("job webhook gave up", extra={"url": url, "job_id": payload.get("job_id")})
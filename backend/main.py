@@ -1,24 +1,80 @@
+import hashlib
 import os
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
+import sys
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from database import get_db
+from database import get_async_db, async_engine, SessionLocal
 import models, schemas
 from auth import get_current_user, get_current_user_optional, authenticate_user, create_access_token
 from auth import router as auth_router
-from ai_model.extractor import FeatureExtractor
-import joblib
+from ai_model import inference, resolver
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
 from urllib.parse import urlparse, urlunparse
-import pandas as pd
-from bs4 import BeautifulSoup
-from fastapi.responses import JSONResponse
-
-db = next(get_db())
-models.Base.metadata.create_all(bind=db.bind)
-
-app = FastAPI()
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, Response
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import timezone
+from sqlalchemy import delete, func, or_, select
+from compression import CompressionMiddleware
+from admission import admission_control
+import oauth_client
+import jobs
+import partitions
+from metrics import render_all as render_metrics
+from logging_config import setup_logging, get_logger, start_request, log_stage
+
+setup_logging()
+resolver.install_urllib3_hook()
+logger = get_logger("api")
+
+
+def _warm_up():
+    """
+    Load the model, then import the analysis pipeline and start the prewarm
+    scheduler, off the event loop. Analyses that arrive earlier wait on the
+    model lock instead of failing.
+    """
+    started = time.perf_counter()
+    try:
+        inference.start_pool()
+        # 마감을 넘긴 첫 요청들이 기본값을 저마다 트리에서 추정하느라 늦어지지 않도록 미리 계산합니다.
+        inference.feature_defaults()
+        logger.info("model loaded", extra={"duration_ms": round((time.perf_counter() - started) * 1000, 1)})
+        retention_scheduler.start()
+        from analysis import scheduler as prewarm_scheduler
+
+        session = SessionLocal()
+        try:
+            prewarm_scheduler.start(db=session)
+        finally:
+            session.close()
+    except Exception:
+        logger.exception("warm-up failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 스키마 생성은 init_db.py가 담당하므로 여기서는 DB에 접속하지 않고 바로 요청을 받습니다.
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    yield
+    job_queue.stop()
+    # 아직 불러오지 않은 모듈은 정리할 것도 없습니다.
+    analysis = sys.modules.get("analysis")
+    if analysis is not None:
+        analysis.shutdown()
+    retention_scheduler.stop()
+    inference.shutdown_pool()
+    await oauth_client.close()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration for secure cookie/token usage
 default_allowed_origins = [
@@ -50,6 +106,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    timings = start_request(request_id)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        logger.exception("request failed", extra={"method": request.method, "path": request.url.path})
+        raise
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    response.headers["X-Request-ID"] = request_id
+    logger.info(
+        "request",
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": elapsed_ms,
+            "stages": timings,
+            "sample": response.status_code < 400,
+        },
+    )
+    return response
+
 # Routers should be included after middleware
 app.include_router(auth_router)
 
@@ -58,23 +141,39 @@ app.include_router(auth_router)
 def root():
     return {"message": "SafeSurf AI backend running"}
 
-model = joblib.load("assets/rf_model_optimized.pkl")
+@app.get("/health")
+def health():
+    """Liveness: answers as soon as the worker accepts connections."""
+    return {"status": "ok", "model_loaded": inference.is_ready()}
+
+@app.get("/health/ready")
+def readiness():
+    """Readiness: 503 until the model has finished loading."""
+    if not inference.is_ready():
+        return JSONResponse(status_code=503, content={"status": "loading"}, headers={"Retry-After": "1"})
+    return {"status": "ready"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return render_metrics()
 
 @app.post("/signup")
-def signup(request: schemas.SignupRequest, db: Session = Depends(get_db)):
-    if db.query(models.User).filter((models.User.email == request.email) |
-                                    (models.User.username == request.username)).first():
+async def signup(request: schemas.SignupRequest, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.execute(
+        select(models.User.id).where(or_(models.User.email == request.email, models.User.username == request.username))
+    )
+    if existing.first():
         raise HTTPException(status_code=409, detail="이미 존재하는 사용자")
 
     try:
-        hashed_pw = models.pwd_context.hash(request.password)
+        # bcrypt 해시는 CPU를 수백 ms 쓰므로 이벤트 루프 밖에서 계산합니다.
+        hashed_pw = await run_in_threadpool(models.pwd_context.hash, request.password)
     except ValueError as exc:
         # bcrypt backend rejects secrets longer than 72 bytes
         raise HTTPException(status_code=400, detail="비밀번호는 72자 이하로 입력해주세요.") from exc
     user = models.User(email=request.email, username=request.username, password_hash=hashed_pw)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     access_token = create_access_token(data={"sub": str(user.id)})
     response = JSONResponse(
         content={
@@ -96,17 +195,16 @@ def signup(request: schemas.SignupRequest, db: Session = Depends(get_db)):
     return response
 
 @app.post("/token")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     user = (
-        db.query(models.User)
-        .filter(
-            (models.User.username == form_data.username)
-            | (models.User.email == form_data.username)
+        await db.execute(
+            select(models.User).where(
+                or_(models.User.username == form_data.username, models.User.email == form_data.username)
+            )
         )
-        .first()
-    )
+    ).scalars().first()
 
-    if not user or not models.pwd_context.verify(form_data.password, user.password_hash):
+    if not user or not await run_in_threadpool(models.pwd_context.verify, form_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 잘못되었습니다.")
 
     token = create_access_token(data={"sub": str(user.id)})
@@ -123,90 +221,127 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     )
     return response
 
-@app.post("/api/analyze")
-def analyze_url(request: schemas.URLAnalyzeRequest, db: Session = Depends(get_db), user: Optional[models.User] = Depends(get_current_user_optional)):
-    extractor = FeatureExtractor()
-    features = extractor.run(request.url)
-    if not features or any(f is None or f != f for f in features):
-        response_data = {
-            "url": request.url,
-            "result": "unanalyzable",
-            "prediction": None,
-            "probability": None,
-            "features": features
-        }
-        print("🚨 Response: Unanalyzable", response_data)
-        return response_data
+job_queue = jobs.create_job_queue()
+retention_scheduler = partitions.RetentionScheduler()
 
-    feature_names = [
-        "IP_Address", "URL_Length", "Shortening_Service", "At_Symbol_Count", "Double_Slash_Count",
-        "Hyphen_Count", "Subdomain_Level", "SSL_Certificate", "External_Favicon", "Non_Standard_Port",
-        "HTTPS_Token", "Domain_Age", "Request_URL_Ratio", "Blacklist", "Redirects"
-    ]
-    feature_vector = [[
-        features[0],  # IP_Address
-        features[1],  # URL_Length
-        features[2],  # Shortening_Service
-        features[3],  # At_Symbol_Count
-        features[4],  # Double_Slash_Count
-        features[5],  # Hyphen_Count
-        features[6],  # Subdomain_Level
-        features[7],  # SSL_Certificate
-        features[8],  # External_Favicon
-        features[9],  # Non_Standard_Port
-        features[10], # HTTPS_Token
-        features[11], # Domain_Age
-        features[12], # Request_URL_Ratio
-        features[13], # Blacklist
-        features[14]  # Redirects
-    ]]  # 리스트로 감싸서 2D로 변환
-
-    df = pd.DataFrame(feature_vector, columns=feature_names)
-    prediction = model.predict(df)[0]
-    proba = model.predict_proba(df)[0]
-    class_index = list(model.classes_).index(prediction)
-    prob = proba[class_index]
-
-    result_map = {-1: "phishing", 0: "suspicious", 1: "legitimate"}
-    result = result_map.get(prediction, "unanalyzable")
-
-    from datetime import datetime, timezone, timedelta
+@app.post("/api/analyze", dependencies=[Depends(admission_control)])
+async def analyze_url(request: schemas.URLAnalyzeRequest, db: AsyncSession = Depends(get_async_db), user: Optional[models.User] = Depends(get_current_user_optional)):
+    from analysis import analyze
+
+    # 특징 추출은 네트워크를 기다리는 동기 코드이므로 스레드에서 돌리고, DB 작업만 이벤트 루프에서 처리합니다.
+    with log_stage("analysis"):
+        analysis = await run_in_threadpool(analyze, request.url, deadline_ms=request.deadline_ms)
+    result = analysis["result"]
+    if result == "unanalyzable":
+        logger.info("analysis unanalyzable", extra={"url": request.url})
+        return {"url": request.url, **analysis}
 
     if user:
-        log = models.SearchLog(
-            user_id=user.id,
-            query_url=request.url,
-            result=result,
-            searched_at=(datetime.utcnow().replace(tzinfo=timezone.utc) + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M:%S KST")
-        )
-        db.add(log)
-        db.commit()
+        with log_stage("db"):
+            db.add(jobs.search_log(user.id, request.url, result))
+            await db.commit()
 
-    print(f"✅ Prediction: {prediction}, Probability: {round(prob, 4)}, Result: {result}")
+    logger.info(
+        "analysis complete",
+        extra={"url": request.url, "prediction": analysis["prediction"], "probability": analysis["probability"], "result": result, "sample": True},
+    )
 
-    return {
-        "url": request.url,
-        "result": result,
-        "prediction": int(prediction),
-        "probability": round(prob, 4),
-        "features": features
-    }
+    if request.explain and analysis.get("features"):
+        with log_stage("explain"):
+            attributions = await run_in_threadpool(inference.explain, analysis["features"])
+            analysis = {**analysis, "attributions": attribution_payload(attributions)}
+
+    return {"url": request.url, **analysis}
+
+@app.post("/api/jobs", status_code=202, dependencies=[Depends(admission_control)])
+def create_job(request: schemas.JobCreateRequest, user: Optional[models.User] = Depends(get_current_user_optional)):
+    """Queue an analysis and return immediately; poll the status URL or wait for the callback."""
+    if request.callback_url:
+        try:
+            jobs.validate_callback(request.callback_url)
+        except jobs.InvalidCallback as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        job = job_queue.submit(
+            request.url,
+            priority=request.priority,
+            user_id=user.id if user else None,
+            callback_url=request.callback_url,
+        )
+    except jobs.QueueFull:
+        raise HTTPException(status_code=503, detail="Analysis queue is full", headers={"Retry-After": "5"})
+    return {"job_id": job.id, "status": job.status, "status_url": f"/api/jobs/{job.id}"}
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str, user: Optional[models.User] = Depends(get_current_user_optional)):
+    job = job_queue.get(job_id)
+    # 로그인한 사용자가 넣은 작업은 본인만 조회할 수 있습니다.
+    if job is None or (job.user_id is not None and (user is None or user.id != job.user_id)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+async def _history_validators(db: AsyncSession, user_id):
+    """
+    Weak ETag and Last-Modified for a user's history, from the number of rows
+    and the newest ``searched_at``. Adding or deleting a row changes the ETag.
+    """
+    count, latest = (
+        await db.execute(
+            select(func.count(models.SearchLog.id), func.max(models.SearchLog.searched_at))
+            .where(models.SearchLog.user_id == user_id)
+        )
+    ).one()
+    digest = hashlib.sha1(f"{user_id}:{count}:{latest}".encode()).hexdigest()[:20]
+    if latest is not None:
+        # SQLite는 시간대 없이 저장한 KST 시각을 돌려주므로, GMT로 내보내기 전에 UTC로 바꿉니다.
+        if latest.tzinfo is None:
+            latest = latest.replace(tzinfo=jobs.KST)
+        latest = latest.astimezone(timezone.utc)
+    return f'W/"{digest}"', latest
+
+def _not_modified(request: Request, etag: str, last_modified) -> bool:
+    # If-None-Match가 있으면 If-Modified-Since는 무시합니다(RFC 9110).
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
 
 @app.get("/history")
-def get_history(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+async def get_history(request: Request, db: AsyncSession = Depends(get_async_db), user: models.User = Depends(get_current_user)):
+    etag, last_modified = await _history_validators(db, user.id)
+    validators = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        validators["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    # 기록이 그대로면 사이트 상태·제목을 다시 조회하지 않고 304로 끝냅니다.
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=validators)
+
     logs = (
-        db.query(models.SearchLog)
-        .filter(models.SearchLog.user_id == user.id)
-        .order_by(models.SearchLog.searched_at.desc())
-        .all()
-    )
+        await db.execute(
+            select(models.SearchLog)
+            .where(models.SearchLog.user_id == user.id)
+            .order_by(models.SearchLog.searched_at.desc())
+        )
+    ).scalars().all()
+    # 사이트 상태·제목 확인은 요청을 보내는 동기 코드이므로 스레드에서 처리합니다.
+    formatted_logs = await run_in_threadpool(_format_history, logs)
+    return ORJSONResponse(formatted_logs, headers=validators)
 
+def _format_history(logs):
     formatted_logs = []
     for log in logs:
         # Determine site status
         status = "Online"
         try:
             import requests
+            from bs4 import BeautifulSoup
             res = requests.head(log.query_url, timeout=2)
             if res.status_code >= 400:
                 status = "Offline"
@@ -252,22 +387,34 @@ def get_history(db: Session = Depends(get_db), user: models.User = Depends(get_c
             "tag": tag,
             "tag_color": tag_color,
         })
-
     return formatted_logs
 
 @app.delete("/history/{log_id}")
-def delete_history(log_id: str, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    log = db.query(models.SearchLog).filter(
-        models.SearchLog.id == log_id,
-        models.SearchLog.user_id == user.id
-    ).first()
-    if not log:
+async def delete_history(log_id: uuid.UUID, db: AsyncSession = Depends(get_async_db), user: models.User = Depends(get_current_user)):
+    deleted = (
+        await db.execute(
+            delete(models.SearchLog).where(models.SearchLog.id == log_id, models.SearchLog.user_id == user.id)
+        )
+    ).rowcount
+    if not deleted:
         raise HTTPException(status_code=404, detail="Log not found")
-
-    db.delete(log)
-    db.commit()
+    await db.commit()
     return {"message": "Log deleted successfully"}
 
+@app.post("/history/delete")
+async def bulk_delete_history(request: schemas.HistoryDeleteRequest, db: AsyncSession = Depends(get_async_db), user: models.User = Depends(get_current_user)):
+    """Delete the user's logs matching every given filter (IDs and/or a searched_at range) in one statement."""
+    statement = delete(models.SearchLog).where(models.SearchLog.user_id == user.id)
+    if request.ids:
+        statement = statement.where(models.SearchLog.id.in_(request.ids))
+    # 기간 조건이 있으면 Postgres가 해당 월 파티션만 훑습니다.
+    if request.since is not None:
+        statement = statement.where(models.SearchLog.searched_at >= request.since)
+    if request.until is not None:
+        statement = statement.where(models.SearchLog.searched_at < request.until)
+    deleted = (await db.execute(statement)).rowcount
+    await db.commit()
+    return {"deleted": deleted}
 
 @app.get("/auth/me")
 def read_users_me(current_user: models.User = Depends(get_current_user)):
@@ -278,59 +425,57 @@ def read_users_me(current_user: models.User = Depends(get_current_user)):
     }
 
 # --- Helper function to generate AI reasoning ---
-def generate_reason(prediction: str, features: dict) -> str:
-    """Return human-friendly explanation aligned with the final prediction."""
-    risk_reasons = []
-    safe_reasons = []
+# 특징 값(-1/0/1 인코딩)별 설명. 개수형 특징(At/Double slash/Hyphen)은 0이면 1, 그 밖에는 -1 문장을 사용합니다.
+FEATURE_DESCRIPTIONS = {
+    "IP_Address": {1: "도메인 이름을 사용합니다.", -1: "도메인 대신 IP 주소를 사용합니다."},
+    "URL_Length": {1: "URL 길이가 정상 범위입니다.", 0: "URL이 다소 깁니다.", -1: "URL이 비정상적으로 깁니다."},
+    "Shortening_Service": {1: "단축 URL이 아닙니다.", -1: "단축 URL 서비스를 사용합니다."},
+    "At_Symbol_Count": {1: "URL에 '@' 기호가 없습니다.", -1: "URL에 '@' 기호가 포함되어 있습니다."},
+    "Double_Slash_Count": {1: "경로에 '//'가 없습니다.", -1: "경로에 '//'가 포함되어 있습니다."},
+    "Hyphen_Count": {1: "도메인에 하이픈이 없습니다.", -1: "도메인에 하이픈이 포함되어 있습니다."},
+    "Subdomain_Level": {1: "서브도메인 구조가 단순합니다.", 0: "서브도메인이 여러 단계입니다.", -1: "서브도메인 수가 과도합니다."},
+    "SSL_Certificate": {1: "SSL 인증서가 신뢰할 수 있습니다.", 0: "HTTPS를 사용하지 않거나 인증서를 검증할 수 없습니다.", -1: "SSL 연결에 오류가 있습니다."},
+    "External_Favicon": {1: "같은 도메인에서 favicon을 불러옵니다.", 0: "favicon이 없습니다.", -1: "외부 도메인에서 favicon을 불러옵니다."},
+    "Non_Standard_Port": {1: "표준 포트를 사용합니다.", -1: "비표준 포트를 사용합니다."},
+    "HTTPS_Token": {1: "도메인에 'https' 문자열이 없습니다.", -1: "도메인에 'https' 문자열이 들어 있습니다."},
+    "Domain_Age": {1: "도메인 등록 기간이 충분합니다.", 0: "도메인 등록 기간이 1년 미만입니다.", -1: "도메인 등록 기간이 짧거나 확인되지 않습니다."},
+    "Request_URL_Ratio": {1: "대부분의 리소스를 같은 도메인에서 불러옵니다.", 0: "외부 리소스 비율이 중간 수준입니다.", -1: "외부 리소스 요청이 과도합니다."},
+    "Blacklist": {1: "블랙리스트에 포함되어 있지 않습니다.", -1: "블랙리스트에 포함되어 있습니다."},
+    "Redirects": {1: "리다이렉트가 거의 없습니다.", 0: "리다이렉트가 여러 번 발생합니다.", -1: "리다이렉트가 과도합니다."},
+}
+COUNT_FEATURES = {"At_Symbol_Count", "Double_Slash_Count", "Hyphen_Count"}
+REASON_TOP_N = 3
+
+def describe_feature(name: str, value) -> str:
+    if name in COUNT_FEATURES:
+        value = 1 if value == 0 else -1
+    return FEATURE_DESCRIPTIONS.get(name, {}).get(value, f"{name} = {value}")
+
+def generate_reason(prediction: str, attributions) -> str:
+    """
+    Explain the verdict with the features that pushed the model hardest toward it.
+    ``attributions`` is ``inference.explain`` output: ``(feature, value, contribution)`` sorted by contribution.
+    """
     localized_prediction = {
         "legitimate": "안전",
         "suspicious": "의심",
         "phishing": "위험",
     }.get(prediction, prediction)
 
-    url_length = features.get("URL_Length")
-    if isinstance(url_length, (int, float)):
-        if url_length > 75:
-            risk_reasons.append("URL이 비정상적으로 길고")
-        elif url_length <= 54:
-            safe_reasons.append("URL 길이가 정상 범위이며")
-
-    subdomains = features.get("Subdomain_Level")
-    if isinstance(subdomains, (int, float)):
-        if subdomains > 3:
-            risk_reasons.append("서브도메인 수가 과도하며")
-        elif subdomains <= 1:
-            safe_reasons.append("서브도메인 구조가 단순하고")
-
-    ssl_ok = features.get("SSL_Certificate", True)
-    if not ssl_ok:
-        risk_reasons.append("SSL 인증서가 유효하지 않습니다.")
-    elif ssl_ok:
-        safe_reasons.append("SSL 인증서가 신뢰할 수 있습니다.")
-
-    if features.get("Blacklist"):
-        risk_reasons.append("블랙리스트에 포함되어 있습니다.")
-
-    request_ratio = features.get("Request_URL_Ratio")
-    if isinstance(request_ratio, (int, float)):
-        if request_ratio > 0.8:
-            risk_reasons.append("외부 리소스 요청이 과도합니다.")
-        elif request_ratio >= 0 and request_ratio < 0.6:
-            safe_reasons.append("외부 리소스 요청 비율이 낮고")
-
-    domain_age = features.get("Domain_Age")
-    if isinstance(domain_age, (int, float)):
-        if domain_age < 6:
-            risk_reasons.append("도메인 등록 기간이 짧습니다.")
-        elif domain_age >= 12:
-            safe_reasons.append("도메인 등록 기간이 충분합니다.")
-
-    if prediction == "legitimate":
-        reasons = safe_reasons or ["주요 URL 특성이 안전 범위 내에 있습니다."]
-    else:
-        reasons = risk_reasons or ["여러 URL 지표가 위험 패턴과 유사합니다."]
-
-    return f"{' '.join(reasons)} 따라서 AI는 이 URL을 {localized_prediction}으로 분류했습니다."
+    reasons = [describe_feature(name, value) for name, value, contribution in (attributions or []) if contribution > 0]
+    if not reasons:
+        reasons = (
+            ["주요 URL 특성이 안전 범위 내에 있습니다."] if prediction == "legitimate"
+            else ["여러 URL 지표가 위험 패턴과 유사합니다."]
+        )
+
+    return f"{' '.join(reasons[:REASON_TOP_N])} 따라서 AI는 이 URL을 {localized_prediction}으로 분류했습니다."
+
+def attribution_payload(attributions):
+    return [
+        {"feature": name, "value": value, "contribution": contribution}
+        for name, value, contribution in attributions or []
+    ]
 
 # --- New /inspect endpoint ---
 def _normalize_cert_names(name_entries):
@@ -372,9 +517,12 @@ def _switch_to_http(parsed):
     return urlunparse(http_parsed), http_parsed
 
 
-@app.get("/inspect")
+@app.get("/inspect", dependencies=[Depends(admission_control)], response_class=ORJSONResponse)
 def inspect_url(url: str):
-    import ssl, socket, requests, json
+    import socket, ssl, requests
+    from ai_model import redirects
+    from ai_model.breaker import breakers
+    from analysis import analyze
 
     result = {"ssl": {}, "headers": {}, "geo": {}, "jarm": "N/A"}
     try:
@@ -386,14 +534,19 @@ def inspect_url(url: str):
         port = parsed.port or (443 if scheme == "https" else 80)
         target_url = normalized_url
 
+        # 최근 연속으로 실패한 호스트나 외부 서비스는 기다리지 않고 건너뜁니다.
+        host_breaker = breakers.for_host(hostname)
+        circuit_open = {"error": "circuit open", "circuit": "open"}
+
         # SSL Info
         http_fallback_requested = False
         try:
-            if scheme == "https" or port == 443:
+            if (scheme == "https" or port == 443) and not host_breaker.allow():
+                result["ssl"] = circuit_open
+            elif scheme == "https" or port == 443:
                 ctx = ssl.create_default_context()
-                conn = ctx.wrap_socket(socket.socket(), server_hostname=hostname)
-                conn.settimeout(3)
-                conn.connect((hostname, port))
+                raw_sock = resolver.create_connection((hostname, port), timeout=3)
+                conn = ctx.wrap_socket(raw_sock, server_hostname=hostname)
                 cert = conn.getpeercert()
                 result["ssl"] = {
                     "issuer": _normalize_cert_names(cert.get("issuer")),
@@ -402,9 +555,15 @@ def inspect_url(url: str):
                     "notAfter": cert.get("notAfter"),
                 }
                 conn.close()
+                host_breaker.record_success()
             else:
                 result["ssl"] = {"info": "HTTPS를 사용하지 않는 URL입니다."}
+        except ssl.SSLError as e:
+            result["ssl"] = {"error": str(e)}
+            if scheme == "https":
+                http_fallback_requested = True
         except Exception as e:
+            host_breaker.record_failure()
             result["ssl"] = {"error": str(e)}
             if scheme == "https":
                 http_fallback_requested = True
@@ -421,51 +580,72 @@ def inspect_url(url: str):
         if http_fallback_requested:
             maybe_switch_to_http()
 
-        # HTTP Headers
-        try:
-            res = requests.head(target_url, timeout=5, allow_redirects=True)
-            result["headers"] = dict(res.headers)
-        except Exception as e:
-            if scheme == "https":
-                maybe_switch_to_http()
-                try:
-                    res = requests.head(target_url, timeout=5, allow_redirects=True)
-                    result["headers"] = dict(res.headers)
-                except Exception as inner_e:
-                    result["headers"] = {"error": str(inner_e)}
-            else:
-                result["headers"] = {"error": str(e)}
+        # HTTP Headers and redirect chain
+        def follow_chain():
+            chain = redirects.follow(target_url, timeout=5, method="HEAD")
+            result["headers"] = dict(chain.response.headers) if chain.response is not None else {}
+            result["redirect_chain"] = chain.to_dict()
+
+        if not host_breaker.allow():
+            result["headers"] = circuit_open
+        else:
+            try:
+                follow_chain()
+                host_breaker.record_success()
+            except Exception as e:
+                if scheme == "https":
+                    maybe_switch_to_http()
+                    try:
+                        follow_chain()
+                        host_breaker.record_success()
+                    except Exception as inner_e:
+                        host_breaker.record_failure()
+                        result["headers"] = {"error": str(inner_e)}
+                else:
+                    host_breaker.record_failure()
+                    result["headers"] = {"error": str(e)}
 
         # Geo info
-        try:
-            ip = socket.gethostbyname(hostname)
-            geo_res = requests.get(f"http://ip-api.com/json/{ip}", timeout=5)
-            result["geo"] = geo_res.json()
-        except Exception as e:
-            result["geo"] = {"error": str(e)}
+        geo_breaker = breakers.get("geo")
+        if not geo_breaker.allow():
+            result["geo"] = circuit_open
+        else:
+            try:
+                with log_stage("geo"):
+                    ip = resolver.resolve(hostname)[0]
+                    geo_res = requests.get(f"http://ip-api.com/json/{ip}", timeout=5)
+                    geo_res.raise_for_status()
+                result["geo"] = geo_res.json()
+                geo_breaker.record_success()
+            except Exception as e:
+                # DNS 실패는 geo 서비스 장애가 아니므로 breaker에 세지 않습니다.
+                if not isinstance(e, socket.gaierror):
+                    geo_breaker.record_failure()
+                result["geo"] = {"error": str(e)}
 
         # Extract features and predict for AI reasoning
-        extractor = FeatureExtractor()
-        features_list = extractor.run(url)
-        feature_names = [
-            "IP_Address", "URL_Length", "Shortening_Service", "At_Symbol_Count", "Double_Slash_Count",
-            "Hyphen_Count", "Subdomain_Level", "SSL_Certificate", "External_Favicon", "Non_Standard_Port",
-            "HTTPS_Token", "Domain_Age", "Request_URL_Ratio", "Blacklist", "Redirects"
-        ]
-        if features_list and len(features_list) == len(feature_names):
-            features_dict = dict(zip(feature_names, features_list))
-            # Predict using the model
-            import pandas as pd
-            df = pd.DataFrame([features_list], columns=feature_names)
-            prediction = model.predict(df)[0]
-            result_map = {-1: "phishing", 0: "suspicious", 1: "legitimate"}
-            result_prediction = result_map.get(prediction, "unanalyzable")
-            ai_reason = generate_reason(result_prediction, features_dict)
+        with log_stage("analysis"):
+            analysis = analyze(url)
+        features_list = analysis["features"]
+        neutral = set()
+        if analysis.get("degraded"):
+            from ai_model.extractor import features_using
+
+            result["degraded"] = analysis["degraded"]
+            neutral = set(features_using(analysis["degraded"]))
+        if analysis.get("allowlisted"):
+            ai_reason = f"{analysis['allowlisted']}은(는) 널리 알려진 도메인 목록에 포함되어 있습니다. 따라서 AI는 이 URL을 안전으로 분류했습니다."
+        elif analysis["prediction"] is not None:
+            attributions = inference.explain(features_list)
+            result["attributions"] = attribution_payload(attributions)
+            # 중립값으로 채운 특징은 실제로 관찰한 근거가 아니므로 설명에서 뺍니다.
+            ai_reason = generate_reason(analysis["result"], [a for a in attributions or [] if a[0] not in neutral])
         else:
             ai_reason = "AI 분석에 필요한 URL 특성 정보를 추출할 수 없습니다."
 
     except Exception as e:
-        return {"error": str(e)}
+        logger.warning("inspect failed", extra={"url": url, "error": str(e)})
+        return ORJSONResponse({"error": str(e)})
 
     result["ai_reason"] = ai_reason
-    return result
+    return ORJSONResponse(result)
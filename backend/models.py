@@ -2,7 +2,7 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Integer, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base, relationship
@@ -30,6 +30,45 @@ class SearchLog(Base):
     query_url = Column(String, nullable=False)
     result = Column(String)
     probability = Column(Float) 
-    searched_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 월 단위 파티션 키이므로 Postgres에서는 기본 키에 포함되어야 합니다.
+    searched_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
     user = relationship("User", back_populates="search_logs")
+
+    __table_args__ = (
+        Index("ix_search_logs_user_searched", "user_id", "searched_at"),
+        # 파티션은 partitions.py가 만들고 보존 기간이 지나면 통째로 지웁니다.
+        {"postgresql_partition_by": "RANGE (searched_at)"},
+    )
+
+class DomainRegistration(Base):
+    __tablename__ = "domain_registrations"
+
+    domain = Column(String, primary_key=True)
+    creation_date = Column(DateTime)
+    expiration_date = Column(DateTime)
+    source = Column(String, nullable=False, default="whois")
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class AnalysisTask(Base):
+    __tablename__ = "analysis_tasks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    url = Column(String, nullable=False)
+    priority = Column(Integer, nullable=False, default=1)
+    status = Column(String, nullable=False, default="queued")
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    callback_url = Column(String)
+    result = Column(JSON)
+    error = Column(String)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String)
+    lease_expires_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # 워커가 대기 작업을 우선순위·입력 순서대로 집어 가는 경로입니다.
+        Index("ix_analysis_tasks_claim", "status", "priority", "created_at"),
+    )
@@ -0,0 +1,155 @@
+### backend/oauth_client.py
+
+import asyncio
+import os
+import re
+import time
+
+import httpx
+from fastapi import HTTPException
+from jose import jwt, JWTError
+
+from logging_config import get_logger
+from metrics import Counter
+
+logger = get_logger("oauth_client")
+
+OAUTH_CONNECT_TIMEOUT = float(os.getenv("OAUTH_CONNECT_TIMEOUT", "2"))
+OAUTH_TIMEOUT = float(os.getenv("OAUTH_TIMEOUT", "5"))
+# 커넥션 풀이 가득 찼을 때 빈 연결을 기다리는 시간. 넘으면 503으로 바로 응답합니다.
+OAUTH_POOL_TIMEOUT = float(os.getenv("OAUTH_POOL_TIMEOUT", "1"))
+OAUTH_MAX_CONNECTIONS = int(os.getenv("OAUTH_MAX_CONNECTIONS", "20"))
+OAUTH_METADATA_TTL = float(os.getenv("OAUTH_METADATA_TTL", "3600"))
+
+GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+
+request_counter = Counter("safesurf_oauth_requests_total", "Calls to OAuth providers by provider and outcome")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+_client = None
+
+
+def get_client():
+    """Shared AsyncClient; connections to each provider are kept alive and reused."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(OAUTH_TIMEOUT, connect=OAUTH_CONNECT_TIMEOUT, pool=OAUTH_POOL_TIMEOUT),
+            limits=httpx.Limits(max_connections=OAUTH_MAX_CONNECTIONS, max_keepalive_connections=OAUTH_MAX_CONNECTIONS),
+            headers={"Accept": "application/json"},
+        )
+    return _client
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def request_json(provider, method, url, **kwargs):
+    """
+    Call a provider endpoint and return the decoded JSON body.
+    Timeouts become 504, a full connection pool 503 and any other transport or
+    HTTP error 502, so a slow provider fails one login instead of holding a worker.
+    """
+    try:
+        response = await get_client().request(method, url, **kwargs)
+        response.raise_for_status()
+        body = response.json()
+    except httpx.PoolTimeout:
+        request_counter.inc(provider=provider, outcome="pool_timeout")
+        raise HTTPException(status_code=503, detail="Too many logins in progress, try again shortly", headers={"Retry-After": "1"})
+    except httpx.TimeoutException:
+        request_counter.inc(provider=provider, outcome="timeout")
+        logger.warning("oauth provider timed out", extra={"provider": provider, "url": url})
+        raise HTTPException(status_code=504, detail=f"{provider} login timed out")
+    except (httpx.HTTPError, ValueError) as e:
+        request_counter.inc(provider=provider, outcome="error")
+        logger.warning("oauth provider call failed", extra={"provider": provider, "url": url, "error": str(e)})
+        raise HTTPException(status_code=502, detail=f"{provider} login failed")
+    request_counter.inc(provider=provider, outcome="ok")
+    return body
+
+
+class CachedDocument:
+    """
+    Provider metadata (discovery document, JWKS) fetched once and reused for
+    its Cache-Control max-age. If a refresh fails, the last good copy is kept.
+    """
+
+    def __init__(self, provider, url, default_ttl=OAUTH_METADATA_TTL):
+        self.provider = provider
+        self.url = url
+        self.default_ttl = default_ttl
+        self.value = None
+        self.expires_at = 0.0
+        self._lock = None
+
+    async def get(self, force=False):
+        if self.value is not None and not force and time.monotonic() < self.expires_at:
+            return self.value
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.value is not None and not force and time.monotonic() < self.expires_at:
+                return self.value
+            try:
+                response = await get_client().get(self.url)
+                response.raise_for_status()
+                value = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                if self.value is None:
+                    raise HTTPException(status_code=502, detail=f"{self.provider} login failed")
+                logger.warning("keeping stale oauth metadata", extra={"url": self.url, "error": str(e)})
+                self.expires_at = time.monotonic() + min(self.default_ttl, 60)
+                return self.value
+            match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+            ttl = float(match.group(1)) if match else self.default_ttl
+            self.value, self.expires_at = value, time.monotonic() + ttl
+            return value
+
+
+google_discovery = CachedDocument("google", GOOGLE_DISCOVERY_URL)
+_google_jwks = None
+
+
+async def google_endpoints():
+    return await google_discovery.get()
+
+
+async def _google_key(kid):
+    global _google_jwks
+    if _google_jwks is None:
+        _google_jwks = CachedDocument("google", (await google_endpoints())["jwks_uri"])
+    jwks = await _google_jwks.get()
+    for force in (False, True):
+        for key in jwks.get("keys", []):
+            if key.get("kid") == kid:
+                return key
+        if not force:
+            # 키가 교체된 직후일 수 있으므로 한 번만 다시 받아 봅니다.
+            jwks = await _google_jwks.get(force=True)
+    return None
+
+
+async def verify_google_id_token(id_token, client_id, access_token=None):
+    """
+    Verify a Google ID token against the cached JWKS and return its claims.
+    This replaces a userinfo round trip on every login.
+    """
+    try:
+        kid = jwt.get_unverified_header(id_token).get("kid")
+        key = await _google_key(kid)
+        if key is None:
+            raise JWTError("unknown signing key")
+        claims = jwt.decode(id_token, key, algorithms=["RS256"], audience=client_id, access_token=access_token)
+    except JWTError as e:
+        logger.warning("google id token rejected", extra={"error": str(e)})
+        raise HTTPException(status_code=400, detail="Invalid Google ID token")
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise HTTPException(status_code=400, detail="Invalid Google ID token")
+    return claims
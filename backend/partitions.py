@@ -0,0 +1,216 @@
+### backend/partitions.py
+
+import argparse
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from database import engine
+from logging_config import get_logger
+from metrics import Counter
+from models import SearchLog
+
+logger = get_logger("partitions")
+
+# 검색 기록을 보관할 개월 수. 0이면 지우지 않습니다.
+SEARCH_LOG_RETENTION_MONTHS = int(os.getenv("SEARCH_LOG_RETENTION_MONTHS", "0"))
+# 쓰기가 기본 파티션으로 새지 않도록 이번 달 이후 몇 달치를 미리 만들어 둡니다.
+SEARCH_LOG_PARTITIONS_AHEAD = int(os.getenv("SEARCH_LOG_PARTITIONS_AHEAD", "3"))
+SEARCH_LOG_MAINTENANCE_INTERVAL = float(os.getenv("SEARCH_LOG_MAINTENANCE_INTERVAL", "21600"))
+
+TABLE = SearchLog.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_(\d{{4}})(\d{{2}})$")
+# 여러 API 인스턴스 중 한 곳에서만 정리 작업을 돌리기 위한 advisory lock 키
+_MAINTENANCE_LOCK = 0x5AFE5_0046
+
+partition_counter = Counter("safesurf_search_log_partitions_total", "search_logs partitions created or dropped")
+
+
+def month_start(value):
+    return value.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_{month:%Y%m}"
+
+
+def is_partitioned(conn):
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+        ),
+        {"table": TABLE},
+    ).first() is not None
+
+
+def existing_partitions(conn):
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+        ),
+        {"table": TABLE},
+    )
+    return {row[0] for row in rows}
+
+
+def ensure_partitions(conn, since=None, ahead=SEARCH_LOG_PARTITIONS_AHEAD, now=None):
+    """
+    Create monthly partitions from ``since`` (default: this month) through
+    ``ahead`` months from now, plus a default partition for anything outside
+    them. Does nothing unless search_logs is a partitioned Postgres table.
+    """
+    if not is_partitioned(conn):
+        return []
+    current = month_start(now or datetime.now(timezone.utc))
+    month = month_start(since) if since is not None else current
+    last = add_months(current, ahead)
+    existing = existing_partitions(conn)
+    created = []
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+            partition_counter.inc(action="created")
+        month = add_months(month, 1)
+    if DEFAULT_PARTITION not in existing:
+        conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT'))
+    if created:
+        logger.info("search_logs partitions created", extra={"partitions": created})
+    return created
+
+
+def drop_expired(conn, keep_months, now=None):
+    """
+    Remove search logs older than ``keep_months`` full months. Whole monthly
+    partitions are detached and dropped; rows left in the default partition
+    (or in an unpartitioned table) are deleted with one statement.
+    Returns ``(dropped_partitions, deleted_rows)``.
+    """
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -keep_months)
+    dropped = []
+    if is_partitioned(conn):
+        for name in sorted(existing_partitions(conn)):
+            match = _PARTITION_NAME.match(name)
+            if not match:
+                continue
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            if add_months(month, 1) <= cutoff:
+                conn.execute(text(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"'))
+                conn.execute(text(f'DROP TABLE "{name}"'))
+                dropped.append(name)
+                partition_counter.inc(action="dropped")
+    deleted = conn.execute(SearchLog.__table__.delete().where(SearchLog.searched_at < cutoff)).rowcount
+    if dropped or deleted:
+        logger.info(
+            "expired search logs removed",
+            extra={"cutoff": cutoff.isoformat(), "partitions": dropped, "rows": deleted},
+        )
+    return dropped, deleted
+
+
+def run_maintenance(bind=engine, keep_months=SEARCH_LOG_RETENTION_MONTHS, ahead=SEARCH_LOG_PARTITIONS_AHEAD):
+    """Create upcoming partitions and apply the retention policy in one transaction."""
+    with bind.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            if not conn.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _MAINTENANCE_LOCK}).scalar():
+                return None
+        created = ensure_partitions(conn, ahead=ahead)
+        dropped, deleted = drop_expired(conn, keep_months) if keep_months > 0 else ([], 0)
+    return {"created": created, "dropped": dropped, "deleted": deleted}
+
+
+def partition_existing(bind=engine, ahead=SEARCH_LOG_PARTITIONS_AHEAD):
+    """
+    Convert an unpartitioned search_logs table (created before partitioning)
+    into the partitioned layout, copying every row. Runs in one transaction
+    and holds an exclusive lock on the old table while copying.
+    """
+    with bind.begin() as conn:
+        if conn.dialect.name != "postgresql":
+            raise SystemExit("Partitioning needs PostgreSQL")
+        if is_partitioned(conn):
+            return 0
+        legacy = f"{TABLE}_unpartitioned"
+        conn.execute(text(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE'))
+        conn.execute(text(f'ALTER TABLE "{TABLE}" RENAME TO "{legacy}"'))
+        conn.execute(text(f'ALTER TABLE "{legacy}" RENAME CONSTRAINT "{TABLE}_pkey" TO "{legacy}_pkey"'))
+        conn.execute(text(f'UPDATE "{legacy}" SET searched_at = now() WHERE searched_at IS NULL'))
+        SearchLog.__table__.create(conn)
+        oldest = conn.execute(text(f'SELECT min(searched_at) FROM "{legacy}"')).scalar()
+        ensure_partitions(conn, since=oldest, ahead=ahead)
+        columns = ", ".join(column.name for column in SearchLog.__table__.columns)
+        copied = conn.execute(text(f'INSERT INTO "{TABLE}" ({columns}) SELECT {columns} FROM "{legacy}"')).rowcount
+        conn.execute(text(f'DROP TABLE "{legacy}"'))
+    logger.info("search_logs partitioned", extra={"rows": copied})
+    return copied
+
+
+class RetentionScheduler:
+    """Background thread that runs ``run_maintenance`` at startup and every SEARCH_LOG_MAINTENANCE_INTERVAL seconds."""
+
+    def __init__(self, interval=SEARCH_LOG_MAINTENANCE_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _loop(self):
+        while True:
+            try:
+                run_maintenance()
+            except Exception:
+                logger.exception("search log maintenance failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="search-log-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage monthly search_logs partitions.")
+    parser.add_argument(
+        "command",
+        choices=["maintain", "migrate"],
+        help="maintain: create upcoming partitions and apply retention; migrate: partition an existing table",
+    )
+    parser.add_argument("--keep-months", type=int, default=SEARCH_LOG_RETENTION_MONTHS, help="0 keeps everything")
+    parser.add_argument("--ahead", type=int, default=SEARCH_LOG_PARTITIONS_AHEAD)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        copied = partition_existing(ahead=args.ahead)
+        print(f"✅ search_logs partitioned ({copied} rows copied)")
+        return
+    summary = run_maintenance(keep_months=args.keep_months, ahead=args.ahead)
+    if summary is None:
+        raise SystemExit("Another instance is running maintenance; try again later")
+    print(
+        f"✅ partitions created: {len(summary['created'])}, dropped: {len(summary['dropped'])}, "
+        f"rows deleted: {summary['deleted']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
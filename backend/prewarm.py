@@ -0,0 +1,165 @@
+### backend/prewarm.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from sqlalchemy import func
+
+from logging_config import get_logger
+from metrics import Counter
+from models import SearchLog
+
+logger = get_logger("prewarm")
+
+PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL", "60"))
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "200"))
+PREWARM_WORKERS = int(os.getenv("PREWARM_WORKERS", "4"))
+# 만료까지 남은 시간이 이 값보다 짧아지면 미리 다시 분석합니다.
+PREWARM_REFRESH_MARGIN = float(os.getenv("PREWARM_REFRESH_MARGIN", str(PREWARM_INTERVAL * 2)))
+PREWARM_HISTORY_DAYS = int(os.getenv("PREWARM_HISTORY_DAYS", "7"))
+PREWARM_URLS_FILE = os.getenv("PREWARM_URLS_FILE")
+HOT_DECAY = float(os.getenv("PREWARM_HOT_DECAY", "0.5"))
+HOT_MAX_TRACKED = int(os.getenv("PREWARM_MAX_TRACKED", "20000"))
+HOT_MIN_SCORE = float(os.getenv("PREWARM_MIN_SCORE", "2"))
+
+refresh_counter = Counter("safesurf_prewarm_refresh_total", "Background re-analyses by trigger")
+
+
+class HotUrlTracker:
+    """
+    Exponentially decayed request counts per canonical URL and per domain.
+    ``decay()`` is called once per scheduler tick so old traffic fades out.
+    """
+
+    def __init__(self, decay=HOT_DECAY, max_tracked=HOT_MAX_TRACKED):
+        self.decay_factor = decay
+        self.max_tracked = max_tracked
+        self.url_scores = {}
+        self.domain_scores = {}
+        self.urls = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, url=None, weight=1.0):
+        domain = urlsplit(key).hostname or key
+        with self._lock:
+            self.url_scores[key] = self.url_scores.get(key, 0.0) + weight
+            self.domain_scores[domain] = self.domain_scores.get(domain, 0.0) + weight
+            self.urls.setdefault(key, url or key)
+
+    def decay(self):
+        with self._lock:
+            for scores in (self.url_scores, self.domain_scores):
+                for key in list(scores):
+                    scores[key] *= self.decay_factor
+                    if scores[key] < 0.05:
+                        del scores[key]
+            if len(self.url_scores) > self.max_tracked:
+                keep = sorted(self.url_scores, key=self.url_scores.get, reverse=True)[:self.max_tracked]
+                self.url_scores = {key: self.url_scores[key] for key in keep}
+            self.urls = {key: self.urls[key] for key in self.url_scores if key in self.urls}
+
+    def hottest(self, limit, min_score=0.0):
+        """Top ``limit`` ``(key, url)`` pairs; URLs on busy domains get a small boost."""
+        with self._lock:
+            ranked = sorted(
+                (key for key, score in self.url_scores.items() if score >= min_score),
+                key=lambda key: self.url_scores[key] + 0.1 * self.domain_scores.get(urlsplit(key).hostname or key, 0.0),
+                reverse=True,
+            )[:limit]
+            return [(key, self.urls.get(key, key)) for key in ranked]
+
+
+class PrewarmScheduler:
+    """
+    Background thread that keeps hot URLs in the verdict cache.
+    On every tick it re-analyzes tracked URLs whose cache entry is missing
+    or about to expire, so popular URLs never see a cold miss.
+    """
+
+    def __init__(self, tracker, cache, refresh, canonicalize):
+        self.tracker = tracker
+        self.cache = cache
+        self.refresh = refresh
+        self.canonicalize = canonicalize
+        self._executor = ThreadPoolExecutor(max_workers=PREWARM_WORKERS, thread_name_prefix="prewarm")
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, url, trigger):
+        """Queue a background re-analysis unless one is already pending for this URL."""
+        key = self.canonicalize(url)
+        with self._pending_lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        refresh_counter.inc(trigger=trigger)
+        self._executor.submit(self._refresh, key, url)
+
+    def _refresh(self, key, url):
+        try:
+            self.refresh(url)
+        except Exception:
+            logger.exception("prewarm refresh failed", extra={"url": url})
+        finally:
+            with self._pending_lock:
+                self._pending.discard(key)
+
+    def seed_from_history(self, db):
+        """Weight the tracker with URLs that were searched most in recent history."""
+        since = datetime.now(timezone.utc) - timedelta(days=PREWARM_HISTORY_DAYS)
+        rows = (
+            db.query(SearchLog.query_url, func.count(SearchLog.id))
+            .filter(SearchLog.searched_at >= since)
+            .group_by(SearchLog.query_url)
+            .order_by(func.count(SearchLog.id).desc())
+            .limit(PREWARM_TOP_N)
+            .all()
+        )
+        for url, hits in rows:
+            self.tracker.record(self.canonicalize(url), url, weight=float(hits))
+        logger.info("seeded hot urls from history", extra={"count": len(rows)})
+
+    def prewarm_file(self, path):
+        with open(path, encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        for url in urls:
+            self.tracker.record(self.canonicalize(url), url)
+            self.submit(url, trigger="startup")
+        logger.info("prewarm list queued", extra={"count": len(urls), "path": path})
+
+    def tick(self):
+        for key, url in self.tracker.hottest(PREWARM_TOP_N, HOT_MIN_SCORE):
+            remaining = self.cache.expires_in(key)
+            if remaining is None or remaining < PREWARM_REFRESH_MARGIN:
+                self.submit(url, trigger="refresh_ahead" if remaining is not None else "hot_miss")
+        self.tracker.decay()
+
+    def _loop(self):
+        while not self._stop.wait(PREWARM_INTERVAL):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("prewarm tick failed")
+
+    def start(self, db=None):
+        if db is not None:
+            try:
+                self.seed_from_history(db)
+            except Exception:
+                logger.exception("could not seed hot urls from history")
+        if PREWARM_URLS_FILE:
+            try:
+                self.prewarm_file(PREWARM_URLS_FILE)
+            except OSError:
+                logger.exception("could not read prewarm list", extra={"path": PREWARM_URLS_FILE})
+        self._thread = threading.Thread(target=self._loop, name="prewarm-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
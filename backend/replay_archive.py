@@ -0,0 +1,99 @@
+### backend/replay_archive.py
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ai_model.inference import FEATURE_NAMES, RESULT_MAP
+from feature_archive import FEATURE_ARCHIVE_DIR, schema
+
+
+def load_archive(directory, since=None, until=None):
+    """Read the archived columns into one Arrow table, optionally limited to a date range (YYYY-MM-DD)."""
+    try:
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise SystemExit("Replaying the feature archive requires pyarrow (pip install pyarrow)")
+    if not os.path.isdir(directory):
+        raise SystemExit(f"No feature archive at {directory}")
+
+    import pyarrow as pa
+
+    # 예전 파일은 특징 열이 int8이므로 현재 스키마(int16)를 지정해 함께 읽습니다.
+    dataset = ds.dataset(
+        directory, schema=schema().append(pa.field("date", pa.string())), format="parquet", partitioning="hive"
+    )
+    filters = None
+    if since:
+        filters = ds.field("date") >= since
+    if until:
+        upper = ds.field("date") <= until
+        filters = upper if filters is None else filters & upper
+    columns = ["url", *FEATURE_NAMES, "prediction", "probability", "extracted_at"]
+    return dataset.to_table(columns=columns, filter=filters)
+
+
+def rescore(model, table):
+    """Score every archived vector in a single vectorized predict_proba call."""
+    matrix = np.column_stack([table[name].to_numpy() for name in FEATURE_NAMES]).astype(np.int16)
+    proba = model.predict_proba(pd.DataFrame(matrix, columns=FEATURE_NAMES))
+    best = proba.argmax(axis=1)
+    return np.asarray(model.classes_)[best], proba[np.arange(len(best)), best]
+
+
+def _label(value):
+    return RESULT_MAP.get(int(value), str(value))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score the archived feature vectors against another model, offline.")
+    parser.add_argument("model", help="model file (.pkl) to evaluate")
+    parser.add_argument("--archive", default=FEATURE_ARCHIVE_DIR, help=f"archive directory (default: {FEATURE_ARCHIVE_DIR})")
+    parser.add_argument("--since", help="first partition date to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last partition date to include (YYYY-MM-DD)")
+    parser.add_argument("-o", "--output", help="write per-URL old/new verdicts to this CSV or .parquet file")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    table = load_archive(args.archive, args.since, args.until)
+    if table.num_rows == 0:
+        print("No archived feature vectors matched.")
+        return
+    loaded = time.perf_counter()
+
+    model = joblib.load(args.model)
+    new_prediction, new_probability = rescore(model, table)
+    scored = time.perf_counter()
+
+    old_prediction = table["prediction"].to_numpy()
+    changed = old_prediction != new_prediction
+    print(f"rows: {table.num_rows}  load: {loaded - started:.2f}s  score: {scored - loaded:.2f}s")
+    print(f"verdict changed: {int(changed.sum())} ({changed.mean():.2%})")
+    pairs, counts = np.unique(np.column_stack([old_prediction, new_prediction]), axis=0, return_counts=True)
+    for (old, new), count in zip(pairs, counts):
+        marker = " " if old == new else "*"
+        print(f" {marker} {_label(old):>12} -> {_label(new):<12} {count}")
+
+    if args.output:
+        result = pd.DataFrame({
+            "url": table["url"].to_numpy(zero_copy_only=False),
+            "extracted_at": table["extracted_at"].to_pandas(),
+            "old_prediction": old_prediction,
+            "old_probability": table["probability"].to_numpy(),
+            "new_prediction": new_prediction,
+            "new_probability": new_probability.round(4),
+        })
+        if args.output.endswith(".parquet"):
+            result.to_parquet(args.output, index=False)
+        else:
+            result.to_csv(args.output, index=False)
+        print(f"✅ results written -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
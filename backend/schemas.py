@@ -1,3 +1,7 @@
+import uuid
+from datetime import datetime
+from typing import List, Literal, Optional
+
 from pydantic import BaseModel, EmailStr, Field, model_validator
 
 class SignupRequest(BaseModel):
@@ -18,3 +22,22 @@ class LoginRequest(BaseModel):
 
 class URLAnalyzeRequest(BaseModel):
     url: str
+    explain: bool = False
+    # 전체 분석 시간 예산(ms). 넘기면 끝나지 않은 probe의 특징을 기본값으로 채워 판정합니다.
+    deadline_ms: Optional[int] = Field(None, ge=50, le=60000)
+
+class JobCreateRequest(BaseModel):
+    url: str
+    priority: Literal["interactive", "normal", "bulk"] = "normal"
+    callback_url: Optional[str] = None
+
+class HistoryDeleteRequest(BaseModel):
+    ids: Optional[List[uuid.UUID]] = Field(None, max_length=1000)
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_filter(self):
+        if not self.ids and self.since is None and self.until is None:
+            raise ValueError("ids, since, until 중 하나 이상을 지정해야 합니다.")
+        return self
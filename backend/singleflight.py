@@ -0,0 +1,73 @@
+### backend/singleflight.py
+
+import threading
+from concurrent.futures import Future
+
+from metrics import Counter
+
+coalesced_counter = Counter("safesurf_singleflight_coalesced_total", "Requests that reused an in-flight analysis")
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time within this process.
+    Callers that arrive while the leader is running wait on its Future and
+    receive the same result (or exception).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        return self._lead(key, future, fn, args, kwargs)
+
+    def submit(self, key, executor, fn, *args, **kwargs):
+        """
+        Like ``do``, but return the shared Future at once so each caller can
+        wait only as long as it wants; a new leader runs ``fn`` on ``executor``.
+        """
+        future, leader = self._join(key)
+        if leader:
+            try:
+                executor.submit(self._lead, key, future, fn, args, kwargs)
+            except BaseException as exc:
+                self._finish(key, future, exc)
+                raise
+        return future
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            coalesced_counter.inc(group=self.name)
+        return future, leader
+
+    def _lead(self, key, future, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            self._finish(key, future, exc)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def _finish(self, key, future, exc=None, result=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
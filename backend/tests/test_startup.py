@@ -0,0 +1,63 @@
+"""Startup regression guard: importing main stays cheap and /health answers before the model loads."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# Wall-clock budget for `import main` in a fresh interpreter. It is about 1s here (FastAPI and SQLAlchemy);
+# pulling scikit-learn/pandas back in at import time adds several seconds.
+IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET", "2.0"))
+HEAVY_MODULES = ("sklearn", "pandas", "joblib", "bs4")
+
+_PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+loaded = [name for name in {heavy!r} if name in sys.modules]
+from fastapi.testclient import TestClient
+# Without entering the client as a context manager the lifespan (and model warm-up) never runs.
+client = TestClient(main.app)
+health = client.get("/health")
+ready = client.get("/health/ready")
+print(json.dumps({{
+    "elapsed": elapsed,
+    "loaded": loaded,
+    "health": [health.status_code, health.json()],
+    "ready": ready.status_code,
+    "loaded_after_health": [name for name in {heavy!r} if name in sys.modules],
+}}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+def _run_probe(tmp_path):
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{tmp_path / 'startup.db'}")
+    env.setdefault("LOG_LEVEL", "WARNING")
+    env["PYTHONPATH"] = str(BACKEND_DIR)
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_import_main_is_fast_and_lazy(tmp_path):
+    result = _run_probe(tmp_path)
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS, f"import main took {result['elapsed']:.2f}s"
+    assert result["loaded"] == []
+
+
+def test_health_answers_before_model_loads(tmp_path):
+    result = _run_probe(tmp_path)
+    status, body = result["health"]
+    assert status == 200
+    assert body["model_loaded"] is False
+    assert result["ready"] == 503
+    assert result["loaded_after_health"] == []
@@ -0,0 +1,184 @@
+### backend/train_model.py
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+from ai_model.imputation import training_modes
+from ai_model.inference import FEATURE_NAMES
+
+LATENCY_SAMPLES = 300
+
+
+def load_labeled(path, label_column):
+    """Read FEATURE_NAMES plus a label column from CSV, Parquet or a Parquet directory."""
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+    missing = [name for name in [*FEATURE_NAMES, label_column] if name not in frame.columns]
+    if missing:
+        raise SystemExit(f"{path} is missing columns: {', '.join(missing)}")
+    frame = frame.dropna(subset=[*FEATURE_NAMES, label_column])
+    return frame[FEATURE_NAMES].astype(np.int16), frame[label_column].astype(int)
+
+
+def truncated_forest(forest, n_trees):
+    """A copy of ``forest`` that keeps only its first ``n_trees`` fitted trees."""
+    pruned = clone(forest).set_params(n_estimators=n_trees)
+    for attr in ("classes_", "n_classes_", "n_features_in_", "feature_names_in_", "n_outputs_", "_n_samples"):
+        if hasattr(forest, attr):
+            setattr(pruned, attr, getattr(forest, attr))
+    pruned.estimators_ = forest.estimators_[:n_trees]
+    pruned.estimator_ = forest.estimator_
+    return pruned
+
+
+def candidates(teacher, X_train, y_train, seed):
+    """
+    Yield ``(name, model)`` pairs: the teacher with fewer trees, shallower
+    forests retrained on the labels, and surrogates distilled from the
+    teacher's own predictions.
+    """
+    n_trees = len(teacher.estimators_)
+    for k in sorted({k for k in (5, 10, 20, 30, 50, n_trees) if k <= n_trees}):
+        yield f"rf-prune-{k}", truncated_forest(teacher, k)
+
+    for depth in (6, 8, 10, 12):
+        for k in (10, 20, 40):
+            forest = RandomForestClassifier(n_estimators=k, max_depth=depth, n_jobs=-1, random_state=seed)
+            yield f"rf-{k}x{depth}", forest.fit(X_train, y_train)
+
+    teacher_labels = teacher.predict(X_train)
+    for iterations in (20, 50, 100):
+        booster = HistGradientBoostingClassifier(max_iter=iterations, max_depth=6, random_state=seed)
+        yield f"gbm-distill-{iterations}", booster.fit(X_train, teacher_labels)
+    linear = LogisticRegression(max_iter=2000)
+    yield "linear-distill", linear.fit(X_train, teacher_labels)
+
+
+def model_size_bytes(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+def single_row_latency_ms(model, X, samples=LATENCY_SAMPLES):
+    """p50/p99 of one predict_proba call on a one-row DataFrame, the way inference.predict scores requests."""
+    if hasattr(model, "n_jobs"):
+        model.set_params(n_jobs=1)
+    rows = X.sample(n=min(samples, len(X)), replace=len(X) < samples, random_state=0).to_numpy()
+    timings = []
+    for row in rows:
+        frame = pd.DataFrame([row], columns=FEATURE_NAMES)
+        started = time.perf_counter()
+        model.predict_proba(frame)
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def evaluate(name, model, X_test, y_test, teacher_test):
+    predicted = model.predict(X_test)
+    p50, p99 = single_row_latency_ms(model, X_test)
+    return {
+        "name": name,
+        "accuracy": float((predicted == y_test.to_numpy()).mean()),
+        "teacher_agreement": float((predicted == teacher_test).mean()),
+        "p50_ms": round(p50, 3),
+        "p99_ms": round(p99, 3),
+        "size_kb": round(model_size_bytes(model) / 1024, 1),
+    }
+
+
+def choose(results, max_p99_ms, max_size_kb):
+    """Most accurate candidate inside the budget; ties go to the faster one."""
+    fitting = [r for r in results if r["p99_ms"] <= max_p99_ms and (max_size_kb is None or r["size_kb"] <= max_size_kb)]
+    if not fitting:
+        return None
+    return max(fitting, key=lambda r: (round(r["accuracy"], 4), -r["p99_ms"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Retrain the phishing RandomForest and compact it to a latency/size budget.",
+    )
+    parser.add_argument("data", help="labeled features: CSV, .parquet or a Parquet directory")
+    parser.add_argument("--label-column", default="Result", help="column holding -1/0/1 labels (default: Result)")
+    parser.add_argument("-o", "--output", default="assets/rf_model_compact.pkl", help="where to write the chosen model")
+    parser.add_argument("--trees", type=int, default=100, help="trees in the full (teacher) forest")
+    parser.add_argument("--max-p99-ms", type=float, default=5.0, help="per-prediction p99 latency budget")
+    parser.add_argument("--max-size-kb", type=float, help="serialized model size budget")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="export the fastest candidate even if none fits the budget")
+    args = parser.parse_args(argv)
+
+    X, y = load_labeled(args.data, args.label_column)
+    stratify = y if y.value_counts().min() >= 2 else None
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=args.seed, stratify=stratify
+    )
+    print(f"rows: {len(X)} (train {len(X_train)}, test {len(X_test)})  classes: {sorted(int(c) for c in y.unique())}")
+
+    started = time.perf_counter()
+    teacher = RandomForestClassifier(n_estimators=args.trees, n_jobs=-1, random_state=args.seed).fit(X_train, y_train)
+    depth = max(tree.get_depth() for tree in teacher.estimators_)
+    print(f"teacher: {args.trees} trees, max depth {depth}, trained in {time.perf_counter() - started:.1f}s on all cores")
+    teacher_test = teacher.predict(X_test)
+
+    results, models = [], {}
+    for name, model in [("rf-full", teacher), *candidates(teacher, X_train, y_train, args.seed)]:
+        models[name] = model
+        results.append(evaluate(name, model, X_test, y_test, teacher_test))
+
+    print(f"\n{'candidate':<18}{'accuracy':>9}{'agree':>8}{'p50 ms':>9}{'p99 ms':>9}{'size KB':>10}")
+    for r in sorted(results, key=lambda r: r["p99_ms"]):
+        print(f"{r['name']:<18}{r['accuracy']:>9.4f}{r['teacher_agreement']:>8.4f}{r['p50_ms']:>9.3f}{r['p99_ms']:>9.3f}{r['size_kb']:>10.1f}")
+
+    chosen = choose(results, args.max_p99_ms, args.max_size_kb)
+    if chosen is None:
+        if not args.force:
+            raise SystemExit(f"\nNo candidate fits p99 <= {args.max_p99_ms}ms; rerun with a larger budget or --force")
+        chosen = min(results, key=lambda r: r["p99_ms"])
+        print("\nNo candidate fits the budget; exporting the fastest one (--force)", file=sys.stderr)
+
+    full = next(r for r in results if r["name"] == "rf-full")
+    print(
+        f"\nchosen: {chosen['name']}  accuracy {chosen['accuracy']:.4f} "
+        f"({chosen['accuracy'] - full['accuracy']:+.4f} vs full forest), p99 {chosen['p99_ms']}ms"
+    )
+
+    # 추론 서버는 한 행씩 예측하므로 스레드를 띄우지 않는 편이 빠릅니다.
+    model = models[chosen["name"]]
+    if hasattr(model, "n_jobs"):
+        model.set_params(n_jobs=1)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump(model, args.output)
+    with open(f"{args.output}.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "chosen": chosen,
+                "candidates": results,
+                "budget": {"p99_ms": args.max_p99_ms, "size_kb": args.max_size_kb},
+                # 분석 마감에 걸린 특징을 채울 값(학습 데이터의 최빈값), inference.feature_defaults가 읽습니다.
+                "feature_defaults": training_modes(X_train, FEATURE_NAMES),
+            },
+            f,
+            indent=2,
+        )
+    print(f"✅ model written -> {args.output} (set MODEL_PATH={args.output} to serve it)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+### backend/verdict_cache.py
+
+import math
+import struct
+import time
+
+from ai_model.inference import RESULT_MAP
+from cache_backend import LocalLRUBackend
+from metrics import Counter
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+# 특징을 int16으로 담도록 형식을 바꾸면서 이름을 바꿨습니다. 예전 형식의 항목은 읽지 않고 자연히 만료됩니다.
+NAMESPACE = "verdict:v2"
+
+lookup_counter = Counter("safesurf_verdict_cache_lookups_total", "Verdict cache lookups by outcome")
+
+# fresh_until(float64, epoch), prediction(int8), probability(float32), feature count(uint8)
+# 다음에 특징 값(int16 × count), 마지막으로 expanded_url(UTF-8)이 붙습니다.
+# *_Count 특징은 개수 그대로라 int8을 넘을 수 있으므로 int16으로 담고, 그 범위를 넘으면 잘라 둡니다.
+# (모델의 개수 특징 분기 기준은 한 자리 수라서 잘라도 판정은 같습니다.)
+_HEADER = struct.Struct("<dbfB")
+_MISSING = -128
+_FEATURE_MISSING = -(2 ** 15)
+_FEATURE_MAX = 2 ** 15 - 1
+_NO_FEATURES = 255
+
+
+def pack_verdict(analysis, fresh_until):
+    """
+    Encode an analysis result in a few dozen bytes instead of JSON.
+
+    Large counts survive the round trip:
+
+    >>> analysis = {"prediction": -1, "probability": 0.5, "features": [1, 200, 40000, -1, None]}
+    >>> unpack_verdict(pack_verdict(analysis, 0.0))[0]["features"]
+    [1, 200, 32767, -1, None]
+    """
+    prediction = analysis["prediction"]
+    probability = analysis["probability"]
+    features = analysis.get("features")
+    if features is None:
+        count, packed = _NO_FEATURES, b""
+    else:
+        values = [
+            _FEATURE_MISSING if f is None or f != f else max(_FEATURE_MISSING + 1, min(_FEATURE_MAX, int(f)))
+            for f in features
+        ]
+        count, packed = len(values), struct.pack(f"<{len(values)}h", *values)
+    header = _HEADER.pack(
+        fresh_until,
+        _MISSING if prediction is None else prediction,
+        math.nan if probability is None else probability,
+        count,
+    )
+    return header + packed + (analysis.get("expanded_url") or "").encode("utf-8")
+
+
+def unpack_verdict(data):
+    """Decode ``pack_verdict`` output into ``(analysis, fresh_until)``."""
+    fresh_until, prediction, probability, count = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    if count == _NO_FEATURES:
+        features = None
+    else:
+        features = [None if f == _FEATURE_MISSING else f for f in struct.unpack_from(f"<{count}h", data, offset)]
+        offset += count * 2
+    prediction = None if prediction == _MISSING else prediction
+    analysis = {
+        "result": "unanalyzable" if prediction is None else RESULT_MAP.get(prediction, "unanalyzable"),
+        "prediction": prediction,
+        "probability": None if probability != probability else round(probability, 4),
+        "features": features,
+    }
+    if offset < len(data):
+        analysis["expanded_url"] = data[offset:].decode("utf-8")
+    return analysis, fresh_until
+
+
+class VerdictCache:
+    """
+    Analysis results keyed by canonical URL, stored packed in a cache backend
+    (an in-process LRU by default, or the shared backend so every worker sees
+    the same entries). Entries are fresh for their TTL and may then be served
+    stale for ``stale_ttl`` more seconds while a refresh runs in the background.
+    """
+
+    def __init__(self, ttl, stale_ttl, max_entries, backend=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.backend = backend if backend is not None else LocalLRUBackend(max_entries)
+
+    def _load(self, key):
+        data = self.backend.get(NAMESPACE, key)
+        return unpack_verdict(data) if data is not None else (None, None)
+
+    def get(self, key):
+        """Return ``(value, state)`` where state is FRESH, STALE or MISS."""
+        value, fresh_until = self._load(key)
+        if value is None:
+            state = MISS
+        else:
+            state = FRESH if time.time() < fresh_until else STALE
+        lookup_counter.inc(outcome=state)
+        return value, state
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        fresh_until = time.time() + ttl
+        self.backend.set(NAMESPACE, key, pack_verdict(value, fresh_until), ttl + self.stale_ttl)
+
+    def expires_in(self, key):
+        """Seconds until ``key`` stops being fresh (negative once stale), or None if it is not cached."""
+        _, fresh_until = self._load(key)
+        if fresh_until is None:
+            return None
+        return fresh_until - time.time()
@@ -0,0 +1,328 @@
+### backend/whois_store.py
+
+import argparse
+import csv
+import os
+import math
+import queue
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ai_model.breaker import Throttled
+from ai_model.extractor import whois_dates
+from ai_model.urls import registrable_domain
+from cache_backend import shared as shared_cache
+from database import SessionLocal, engine
+from logging_config import get_logger
+from metrics import Counter
+from models import DomainRegistration
+
+logger = get_logger("whois_store")
+
+WHOIS_REFRESH_DAYS = int(os.getenv("WHOIS_REFRESH_DAYS", "30"))
+# 날짜를 얻지 못한 도메인은 이 시간 동안 다시 조회하지 않습니다.
+WHOIS_NEGATIVE_TTL_HOURS = int(os.getenv("WHOIS_NEGATIVE_TTL_HOURS", "6"))
+WHOIS_RATE_PER_SECOND = float(os.getenv("WHOIS_RATE_PER_SECOND", "2"))
+WHOIS_WORKERS = int(os.getenv("WHOIS_WORKERS", "2"))
+WHOIS_QUEUE_SIZE = int(os.getenv("WHOIS_QUEUE_SIZE", "200"))
+WHOIS_LOOKUP_TIMEOUT = float(os.getenv("WHOIS_LOOKUP_TIMEOUT", "10"))
+IMPORT_BATCH_SIZE = 5000
+# 공유 캐시에 올려 두는 시간. 워커마다 DB를 다시 읽지 않도록 하는 앞단 캐시입니다.
+WHOIS_SHARED_CACHE_TTL = float(os.getenv("WHOIS_SHARED_CACHE_TTL", "3600"))
+
+# creation_date, expiration_date를 epoch 초(float64)로, 값이 없으면 NaN으로 저장합니다.
+_DATES = struct.Struct("<dd")
+
+lookup_counter = Counter("safesurf_whois_lookups_total", "Domain registration lookups by source")
+
+
+def _naive_utc(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value if isinstance(value, datetime) else None
+
+
+def _upsert(session, rows):
+    """Insert or update DomainRegistration rows with one statement per batch."""
+    if not rows:
+        return
+    insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(DomainRegistration).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DomainRegistration.domain],
+        set_={
+            "creation_date": stmt.excluded.creation_date,
+            "expiration_date": stmt.excluded.expiration_date,
+            "source": stmt.excluded.source,
+            "fetched_at": stmt.excluded.fetched_at,
+        },
+    )
+    session.execute(stmt)
+    session.commit()
+
+
+class RateLimitedWhoisQueue:
+    """
+    Bounded queue of live WHOIS lookups drained by a few worker threads that
+    together stay under WHOIS_RATE_PER_SECOND. Lookups for a domain that is
+    already queued share the same Future.
+    """
+
+    def __init__(self, rate, workers, size):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._queue = queue.Queue(maxsize=size)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._slot_lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"whois-{i}", daemon=True) for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, domain):
+        with self._lock:
+            future = self._pending.get(domain)
+            if future is not None:
+                return future
+            future = Future()
+            try:
+                self._queue.put_nowait((domain, future))
+            except queue.Full:
+                future.set_exception(Throttled("WHOIS lookup queue is full"))
+                return future
+            self._pending[domain] = future
+        return future
+
+    def _wait_for_slot(self):
+        with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _work(self):
+        while True:
+            domain, future = self._queue.get()
+            try:
+                self._wait_for_slot()
+                dates = _fetch_and_store(domain)
+            except Exception as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(dates)
+            finally:
+                with self._lock:
+                    self._pending.pop(domain, None)
+
+
+def _keep_stored(domain):
+    """
+    After a failed live lookup, keep whatever the table already has and
+    return it; only a domain with no row gets a NULL-dated one. A row with
+    dates is pushed back so it is retried after WHOIS_NEGATIVE_TTL_HOURS
+    instead of on every analysis.
+    """
+    now = datetime.now(timezone.utc)
+    session = SessionLocal()
+    try:
+        record = session.get(DomainRegistration, domain)
+        if record is None:
+            _upsert(session, [{
+                "domain": domain, "creation_date": None, "expiration_date": None, "source": "whois", "fetched_at": now,
+            }])
+            return None, None
+        if record.creation_date and record.expiration_date:
+            record.fetched_at = now - timedelta(days=WHOIS_REFRESH_DAYS) + timedelta(hours=WHOIS_NEGATIVE_TTL_HOURS)
+        else:
+            record.fetched_at = now
+        session.commit()
+        return record.creation_date, record.expiration_date
+    finally:
+        session.close()
+
+
+def _fetch_and_store(domain):
+    """Look ``domain`` up live and store it. Returns ``(dates, observed)``; ``observed`` is False when WHOIS failed."""
+    try:
+        creation_date, expiration_date = whois_dates(domain)
+    except Exception as exc:
+        logger.info("live whois lookup failed", extra={"domain": domain, "error": str(exc)})
+        return _keep_stored(domain), False
+    row = {
+        "domain": domain,
+        "creation_date": _naive_utc(creation_date),
+        "expiration_date": _naive_utc(expiration_date),
+        "source": "whois",
+        "fetched_at": datetime.now(timezone.utc),
+    }
+    session = SessionLocal()
+    try:
+        _upsert(session, [row])
+    finally:
+        session.close()
+    return (row["creation_date"], row["expiration_date"]), True
+
+
+_live_queue = None
+_live_queue_lock = threading.Lock()
+
+
+def _get_live_queue():
+    global _live_queue
+    with _live_queue_lock:
+        if _live_queue is None:
+            _live_queue = RateLimitedWhoisQueue(WHOIS_RATE_PER_SECOND, WHOIS_WORKERS, WHOIS_QUEUE_SIZE)
+    return _live_queue
+
+
+def _is_fresh(record):
+    fetched_at = record.fetched_at
+    if fetched_at is None:
+        return False
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    age = datetime.now(timezone.utc) - fetched_at
+    if record.creation_date and record.expiration_date:
+        return age < timedelta(days=WHOIS_REFRESH_DAYS)
+    return age < timedelta(hours=WHOIS_NEGATIVE_TTL_HOURS)
+
+
+def _pack_dates(creation_date, expiration_date):
+    return _DATES.pack(*(
+        value.replace(tzinfo=timezone.utc).timestamp() if value else math.nan
+        for value in (creation_date, expiration_date)
+    ))
+
+
+def _unpack_dates(data):
+    return tuple(
+        None if value != value else datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+        for value in _DATES.unpack(data)
+    )
+
+
+def _publish(domain, dates):
+    if shared_cache is not None:
+        ttl = WHOIS_SHARED_CACHE_TTL if all(dates) else min(WHOIS_SHARED_CACHE_TTL, WHOIS_NEGATIVE_TTL_HOURS * 3600)
+        shared_cache.set("whois", domain, _pack_dates(*dates), ttl)
+
+
+def lookup(hostname):
+    """
+    Return ``(creation_date, expiration_date)`` for the registrable domain of
+    ``hostname``. The shared cache answers first when one is configured, then
+    the local table when it has a fresh row. Otherwise the domain goes through
+    the rate-limited live WHOIS queue and the answer is stored for next time.
+    When that queue is full or too slow, stale stored dates are returned, or
+    ``Throttled`` is raised when there are none.
+    """
+    domain = registrable_domain(hostname)
+    if shared_cache is not None:
+        data = shared_cache.get("whois", domain)
+        if data is not None:
+            lookup_counter.inc(source="cache")
+            return _unpack_dates(data)
+
+    session = SessionLocal()
+    try:
+        record = session.get(DomainRegistration, domain)
+    finally:
+        session.close()
+    if record is not None and _is_fresh(record):
+        lookup_counter.inc(source="store")
+        dates = (record.creation_date, record.expiration_date)
+    else:
+        lookup_counter.inc(source="live")
+        try:
+            dates, observed = _get_live_queue().submit(domain).result(timeout=WHOIS_LOOKUP_TIMEOUT)
+        except (Throttled, TimeoutError):
+            # 속도 제한에 걸린 것은 WHOIS 장애가 아니므로, 저장된 날짜가 있으면 그대로 쓰고 없으면 Throttled로 알립니다.
+            if record is not None and (record.creation_date or record.expiration_date):
+                lookup_counter.inc(source="stale")
+                return record.creation_date, record.expiration_date
+            raise Throttled(f"live WHOIS lookup for {domain} is throttled")
+        if not observed:
+            # 실패한 조회 결과는 다른 워커에 퍼뜨리지 않습니다.
+            return dates
+    _publish(domain, dates)
+    return dates
+
+
+def _parse_date(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    return _naive_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def bulk_import(rows, source="import"):
+    """
+    Upsert ``(domain, creation_date, expiration_date)`` tuples in batches.
+    Returns the number of rows written.
+    """
+    session = SessionLocal()
+    written = 0
+    batch = {}
+    fetched_at = datetime.now(timezone.utc)
+    try:
+        for domain, creation_date, expiration_date in rows:
+            domain = registrable_domain(domain)
+            batch[domain] = {
+                "domain": domain,
+                "creation_date": creation_date,
+                "expiration_date": expiration_date,
+                "source": source,
+                "fetched_at": fetched_at,
+            }
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _upsert(session, list(batch.values()))
+                written += len(batch)
+                batch = {}
+        _upsert(session, list(batch.values()))
+        written += len(batch)
+    finally:
+        session.close()
+    return written
+
+
+def _read_csv(f):
+    """Yield rows from a ``domain,creation_date,expiration_date`` CSV (header optional, ISO dates)."""
+    for line_no, row in enumerate(csv.reader(f), start=1):
+        if not row or row[0].startswith("#") or (line_no == 1 and row[0].strip().lower() == "domain"):
+            continue
+        try:
+            yield row[0].strip(), _parse_date(row[1] if len(row) > 1 else ""), _parse_date(row[2] if len(row) > 2 else "")
+        except ValueError:
+            logger.warning("skipping malformed row", extra={"line": line_no})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import domain registration dates into the local WHOIS store.")
+    parser.add_argument("path", help="CSV file with domain,creation_date,expiration_date ('-' for stdin)")
+    parser.add_argument("--source", default="import", help="source label stored with each row")
+    args = parser.parse_args(argv)
+
+    DomainRegistration.__table__.create(bind=engine, checkfirst=True)
+    if args.path == "-":
+        count = bulk_import(_read_csv(sys.stdin), source=args.source)
+    else:
+        with open(args.path, newline="", encoding="utf-8") as f:
+            count = bulk_import(_read_csv(f), source=args.source)
+    print(f"✅ {count} domains imported")
+
+
+if __name__ == "__main__":
+    from logging_config import setup_logging
+
+    setup_logging()
+    main()
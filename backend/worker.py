@@ -0,0 +1,136 @@
+### backend/worker.py
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import jobs
+from ai_model import inference, resolver
+from logging_config import setup_logging, get_logger
+from metrics import Counter, Gauge
+
+logger = get_logger("worker")
+
+# 대기 작업이 없을 때 다시 확인하기까지 기다리는 시간(초)
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))
+
+claimed_counter = Counter("safesurf_worker_claimed_total", "Analysis tasks claimed by this worker")
+running_gauge = Gauge("safesurf_worker_running", "Analysis tasks this worker is running")
+
+
+class Worker:
+    """
+    Claims analysis tasks from the database queue and runs up to
+    ``concurrency`` of them at once. A heartbeat thread renews the leases
+    of running tasks; on SIGTERM/SIGINT the worker stops claiming and
+    finishes what it holds.
+    """
+
+    def __init__(self, queue, concurrency, poll_interval=JOBS_POLL_INTERVAL, worker_id=None, run=jobs._run_analysis):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.run = run
+        self.stopping = threading.Event()
+        self._running = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="analysis")
+
+    def _execute(self, job):
+        try:
+            try:
+                finished = self.queue.finish(self.worker_id, job, result=self.run(job.url))
+            except Exception as e:
+                logger.warning("analysis task failed", extra={"job_id": job.id, "url": job.url, "error": str(e)})
+                finished = self.queue.finish(self.worker_id, job, error=str(e))
+            if finished is not None:
+                self._finished(finished)
+        except Exception:
+            logger.exception("could not store task result", extra={"job_id": job.id})
+        finally:
+            with self._lock:
+                self._running.pop(job.id, None)
+            running_gauge.dec()
+
+    def _finished(self, job):
+        jobs.jobs_counter.inc(status=job.status)
+        if job.callback_url:
+            jobs.deliver_webhook(job.callback_url, job.to_dict())
+
+    def _heartbeat(self):
+        # 임대 시간의 1/3마다 갱신해 한두 번 실패해도 임대가 끊기지 않게 합니다.
+        interval = self.queue.lease.total_seconds() / 3
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                job_ids = list(self._running)
+            if self.stopping.is_set() and not job_ids:
+                return
+            try:
+                self.queue.renew(self.worker_id, job_ids)
+            except Exception:
+                logger.exception("lease renewal failed")
+
+    def serve(self):
+        heartbeat = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+        heartbeat.start()
+        logger.info("worker started", extra={"worker_id": self.worker_id, "concurrency": self.concurrency})
+        while not self.stopping.is_set():
+            with self._lock:
+                free = self.concurrency - len(self._running)
+            claimed = []
+            if free > 0:
+                try:
+                    for job in self.queue.reap():
+                        self._finished(job)
+                    claimed = self.queue.claim(self.worker_id, free)
+                except Exception:
+                    logger.exception("claiming tasks failed")
+            for job in claimed:
+                claimed_counter.inc()
+                running_gauge.inc()
+                with self._lock:
+                    self._running[job.id] = job
+                self._executor.submit(self._execute, job)
+            if not claimed:
+                self.stopping.wait(self.poll_interval)
+        logger.info("worker draining", extra={"worker_id": self.worker_id, "running": len(self._running)})
+        self._executor.shutdown(wait=True)
+
+    def stop(self, *_):
+        self.stopping.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run analysis tasks queued with JOBS_BACKEND=postgres.")
+    parser.add_argument("-c", "--concurrency", type=int, default=jobs.JOBS_WORKERS, help="analyses to run at once")
+    parser.add_argument("--poll-interval", type=float, default=JOBS_POLL_INTERVAL)
+    parser.add_argument("--worker-id", help="name recorded on claimed tasks (default: host-pid-random)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    resolver.install_urllib3_hook()
+    inference.start_pool()
+
+    worker = Worker(jobs.DatabaseJobQueue(), args.concurrency, poll_interval=args.poll_interval, worker_id=args.worker_id)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    print(f"✅ worker {worker.worker_id} polling for analysis tasks ({args.concurrency} at a time)")
+    try:
+        worker.serve()
+    finally:
+        analysis = sys.modules.get("analysis")
+        if analysis is not None:
+            analysis.shutdown()
+        inference.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
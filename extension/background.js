@@ -3,6 +3,7 @@ import {
   ANALYZE_ENDPOINT,
   CACHE_TTL_MS,
   REQUEST_TIMEOUT_MS,
+  ANALYSIS_DEADLINE_MS,
   RISK_RESULTS
 } from "./config.js";
 
@@ -31,6 +32,8 @@ const normalizeUrl = (rawUrl) => {
 };
 
 const cacheResult = (url, data) => {
+  // 마감 시간 때문에 일부 항목을 기본값으로 채운 결과는 서버가 곧 온전한 결과로 바꿔 두므로 보관하지 않습니다.
+  if (data.imputed) return;
   resultCache.set(url, { timestamp: Date.now(), data });
   if (resultCache.size > 100) {
     const oldestKey = resultCache.keys().next().value;
@@ -111,7 +114,7 @@ const analyzeUrl = async (tabId, url) => {
     const response = await fetch(buildEndpoint(), {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ url: normalized }),
+      body: JSON.stringify({ url: normalized, deadline_ms: ANALYSIS_DEADLINE_MS }),
       signal: controller.signal
     });
 
@@ -2,4 +2,6 @@ export const API_BASE_URL = "http://localhost:8000";
 export const ANALYZE_ENDPOINT = "/api/analyze";
 export const CACHE_TTL_MS = 5 * 60 * 1000; // 5 minutes
 export const REQUEST_TIMEOUT_MS = 4000;
+// 서버가 이 시간(ms) 안에 끝나지 않은 검사 항목을 기본값으로 채워 바로 판정합니다.
+export const ANALYSIS_DEADLINE_MS = 1500;
 export const RISK_RESULTS = new Set(["phishing", "suspicious"]);